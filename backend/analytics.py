@@ -1,25 +1,66 @@
 """
 Analytics: one set of metrics per space. Only spaces present in the layout are included.
 """
+import numpy as np
+
+from jit import NUMBA_AVAILABLE, njit
 from simulation.floorplan import ROOM_CONFIGS, SPACES, CellType
 
 SETPOINT_C = 19.0  # Typical UK campus heating setpoint
 HEAT_LOSS_FACTOR = 0.2  # W/m³°C
 
+# Static per-space lookups for the default layout
+_SPACE_CT_SETS = {s["id"]: frozenset(s["cell_types"]) for s in SPACES}
+_SPACE_FIRST_CT = {
+    s["id"]: next((ct for ct in s["cell_types"] if ct in ROOM_CONFIGS), None) for s in SPACES
+}
+_SPACE_CT_IDX = {s["id"]: [int(ct) for ct in _SPACE_CT_SETS[s["id"]]] for s in SPACES}
+_MAX_SPACE_CT = max(int(ct) for s in SPACES for ct in s["cell_types"])
+
+
+# (grid array, present cell types); the engine builds its grid array once, so identity is the key
+_present_cache: tuple[np.ndarray | None, set[int]] = (None, set())
+
 
-def _cell_types_in_grid(grid: list[list[int]]) -> set[int]:
+def _cell_types_in_grid(grid: np.ndarray | list[list[int]]) -> set[int]:
     """Cell types that appear at least once in the grid."""
-    present = set()
-    for row in grid:
-        for cell in row:
-            if cell != 0:
-                present.add(cell)
+    global _present_cache
+    if not isinstance(grid, np.ndarray):
+        present = set()
+        for row in grid:
+            for cell in row:
+                if cell != 0:
+                    present.add(cell)
+        return present
+    if _present_cache[0] is grid:
+        return _present_cache[1]
+    present = set(np.unique(grid[grid != 0]).tolist())
+    _present_cache = (grid, present)
     return present
 
 
+@njit(cache=True)
+def _aggregate_by_cell_type(grid, sums, sqsums, counts, subdiv, n_types):
+    """One pass over fine cells: (n, sum, sqsum) per coarse cell type."""
+    n = np.zeros(n_types)
+    s = np.zeros(n_types)
+    sq = np.zeros(n_types)
+    for fr in range(counts.shape[0]):
+        gr = fr // subdiv
+        for fc in range(counts.shape[1]):
+            k = counts[fr, fc]
+            if k == 0:
+                continue
+            ct = grid[gr, fc // subdiv]
+            n[ct] += k
+            s[ct] += sums[fr, fc]
+            sq[ct] += sqsums[fr, fc]
+    return n, s, sq
+
+
 def compute_room_analytics(
-    heatmap_data: dict[tuple[int, int], list[float]],
-    grid: list[list[int]],
+    heatmap: tuple[np.ndarray, np.ndarray, np.ndarray],
+    grid: np.ndarray | list[list[int]],
     room_configs: dict = None,
     heatmap_subdiv: int = 1,
     spaces: list[dict] = None,
@@ -27,63 +68,80 @@ def compute_room_analytics(
     """
     One analytics entry per space that is present in the layout.
     Aggregates temperature only from cells belonging to that space.
+    heatmap is (sums, sqsums, counts) over fine cells, shape (rows*subdiv, cols*subdiv),
+    as returned by SimulationEngine.get_heatmap_sums().
     """
-    room_configs = room_configs or ROOM_CONFIGS
-    spaces = spaces or SPACES
-    rows, cols = len(grid), len(grid[0]) if grid else 0
+    if room_configs is None and spaces is None:
+        space_ct_sets, space_first_ct, space_ct_idx = _SPACE_CT_SETS, _SPACE_FIRST_CT, _SPACE_CT_IDX
+        max_space_ct = _MAX_SPACE_CT
+        room_configs, spaces = ROOM_CONFIGS, SPACES
+    else:
+        room_configs = room_configs or ROOM_CONFIGS
+        spaces = spaces or SPACES
+        space_ct_sets = {s["id"]: frozenset(s["cell_types"]) for s in spaces}
+        space_first_ct = {
+            s["id"]: next((ct for ct in s["cell_types"] if ct in room_configs), None) for s in spaces
+        }
+        space_ct_idx = {sid: [int(ct) for ct in cts] for sid, cts in space_ct_sets.items()}
+        max_space_ct = max((int(ct) for cts in space_ct_sets.values() for ct in cts), default=0)
+    grid_np = np.asarray(grid, dtype=np.int64)
+    rows, cols = grid_np.shape if grid_np.ndim == 2 else (0, 0)
+    grid_np = grid_np.reshape(rows, cols)
     present_cell_types = _cell_types_in_grid(grid)
 
     # Which spaces are present (have at least one cell type in the grid)
-    space_cell_types = {s["id"]: set(s["cell_types"]) for s in spaces}
-    present_space_ids = [
+    present_space_ids = {
         s["id"] for s in spaces
-        if present_cell_types & set(s["cell_types"])
-    ]
+        if present_cell_types & space_ct_sets[s["id"]]
+    }
 
-    # Aggregate temps by cell type (coarse cell -> list of temps)
-    cell_temps: dict[int, list[float]] = {}
-    for (row, col), temps in heatmap_data.items():
-        if not temps:
-            continue
-        r = row // heatmap_subdiv
-        c = col // heatmap_subdiv
-        if r >= rows or c >= cols:
-            continue
-        cell = grid[r][c]
-        if cell == 0:
-            continue
-        if cell not in cell_temps:
-            cell_temps[cell] = []
-        cell_temps[cell].extend(temps)
+    # Aggregate temps by cell type: fold the fine running aggregates into coarse cells,
+    # then group coarse cells by cell type (fused JIT pass, or reshape-sum + bincount).
+    sums, sqsums, counts = heatmap
+    n_types = 1 + max(int(grid_np.max(initial=0)), max_space_ct)
+    if NUMBA_AVAILABLE:
+        n, sums, sqsums = _aggregate_by_cell_type(
+            grid_np, sums, sqsums, counts, heatmap_subdiv, n_types
+        )
+    else:
+        cell = grid_np.ravel()
+
+        def _by_cell_type(fine: np.ndarray) -> np.ndarray:
+            coarse = np.asarray(fine, dtype=np.float64).reshape(
+                rows, heatmap_subdiv, cols, heatmap_subdiv
+            ).sum(axis=(1, 3))
+            return np.bincount(cell, weights=coarse.ravel(), minlength=n_types)
+
+        n = _by_cell_type(counts)
+        sums = _by_cell_type(sums)
+        sqsums = _by_cell_type(sqsums)
 
     results = []
     for space in spaces:
-        if space["id"] not in present_space_ids:
+        sid = space["id"]
+        if sid not in present_space_ids:
             continue
-        ct_set = set(space["cell_types"])
-        # All temps from cells that belong to this space
-        temps = []
-        for ct in ct_set:
-            temps.extend(cell_temps.get(int(ct), []))
-        first_ct = next((ct for ct in space["cell_types"] if ct in room_configs), None)
+        first_ct = space_first_ct[sid]
         if first_ct is None:
             continue
         room = room_configs[first_ct]
         if not room:
             continue
-        if not temps:
+        # All temps from cells that belong to this space
+        ct_idx = space_ct_idx[sid]
+        total_n = int(n[ct_idx].sum())
+        if not total_n:
             avg_temp = room.base_temp
             variance = 0.0
         else:
-            avg_temp = sum(temps) / len(temps)
-            variance = sum((t - avg_temp) ** 2 for t in temps) / len(temps)
+            avg_temp = float(sums[ct_idx].sum()) / total_n
+            variance = max(0.0, float(sqsums[ct_idx].sum()) / total_n - avg_temp * avg_temp)
         delta_t = avg_temp - SETPOINT_C
         wasted_power = max(0, delta_t * room.volume_m3 * HEAT_LOSS_FACTOR)
         sustainability_score = max(0, 100 - abs(delta_t) * 10 - variance * 2)
         overheating = delta_t > 2.0
-        ventilation_risk = variance > 1.0
         results.append({
-            "room_id": space["id"],
+            "room_id": sid,
             "room_name": space["name"],
             "avg_temperature_c": round(avg_temp, 2),
             "delta_t_from_setpoint": round(delta_t, 2),
@@ -92,6 +150,6 @@ def compute_room_analytics(
             "sustainability_score": round(min(100, sustainability_score), 1),
             "overheating": overheating,
             "energy_waste_risk": overheating,
-            "ventilation_quality_flag": ventilation_risk,
+            "ventilation_quality_flag": variance > 1.0,
         })
     return results
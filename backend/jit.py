@@ -0,0 +1,23 @@
+"""
+Optional Numba JIT. When numba is not installed, njit is a no-op decorator and
+prange is range, so kernels still run (as plain Python); callers with a NumPy
+alternative should check NUMBA_AVAILABLE and prefer it.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+    logger.info("numba not installed; JIT kernels run as plain Python")
@@ -3,7 +3,6 @@ FastAPI backend: REST + WebSocket for ThermalScout.
 Supports simulation mode (default) or Arduino mode (SIMULATE=1 or SERIAL_PORT set).
 """
 import asyncio
-import json
 import logging
 import os
 import sys
@@ -16,16 +15,25 @@ logging.basicConfig(
     format="%(asctime)s %(levelname)s %(name)s: %(message)s",
     stream=sys.stdout,
 )
+from collections import deque
 from contextlib import asynccontextmanager
-from queue import Queue
+from functools import lru_cache
+from math import radians
+from operator import itemgetter
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+import numpy as np
+import orjson
+from fastapi import FastAPI, Request, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 
 from simulation.engine import SimulationEngine, ROBOT_IDS
-from simulation.floorplan import get_room_name
+from simulation.floorplan import DEFAULT_GRID, OBSTACLE_CELLS
 from analytics import compute_room_analytics
-from src.models import ArduinoReadingsPayload
+from src.arduino_connection import get_connection, warm_up_jit
+from src.fake_sensors import generate_fake_payload
+from src.models import ArduinoReadingsPayload, FrontendUpdate
+from src.path_planning import RobotState
+from src.serial_reader import find_arduino_uno_port, run_serial_reader
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +46,13 @@ DEFAULT_ROBOT_NAMES = {
     "robot-3": "Scout Gamma",
     "robot-4": "Physical Robot",
 }
+# Floorplan dims for Arduino -> floor coordinate mapping; the grid is fixed at import
+_FLOOR_ROWS = len(DEFAULT_GRID)
+_FLOOR_COLS = len(DEFAULT_GRID[0]) if DEFAULT_GRID else 1
+# Static floorplan obstacles as [row, col]; built once, shared by every /api/map response.
+_OBSTACLE_CELLS_LIST = [[r, c] for r, c in OBSTACLE_CELLS]
 ARDUINO_ACTIVE_TIMEOUT = 10.0  # seconds; physical robot active if Arduino data within this
+SERIAL_DROP_LOG_INTERVAL = 10.0  # seconds between "skipped stale updates" log lines
 
 # Simulation mode
 engine: SimulationEngine | None = None
@@ -49,32 +63,116 @@ _arduino_sim_task: asyncio.Task | None = None
 _arduino_serial_task: asyncio.Task | None = None
 _arduino_serial_thread: threading.Thread | None = None
 _arduino_serial_stop: threading.Event | None = None
-ws_connections: list[WebSocket] = []
+# /ws clients -> their send queue; each client has its own writer task (see _ws_writer)
+ws_connections: dict[WebSocket, asyncio.Queue[bytes]] = {}
+WS_SEND_QUEUE = 4  # frames buffered per /ws client; oldest dropped when a client falls behind
 
 # Arduino mode: latest update for /ws/live bridge
 _arduino_last_update: float | None = None
-_latest_arduino_update: dict | None = None
+_latest_arduino_update: FrontendUpdate | None = None
+# (update it was dumped from, dict); filled on first read, see _arduino_update_dict
+_arduino_dict_cache: tuple[FrontendUpdate | None, dict | None] = (None, None)
+# (update it was built from, encoded robot_update); updates are replaced, never mutated
+_arduino_frame_cache: tuple[FrontendUpdate | None, bytes] = (None, b"")
 
+# /ws/live subscribers -> their send queue; one broadcast task serializes each frame once
+# for all of them, and each client has its own writer task (see _ws_writer)
+live_connections: dict[WebSocket, asyncio.Queue[bytes]] = {}
+_live_task: asyncio.Task | None = None
+LIVE_INTERVAL = 0.15  # seconds between /ws/live broadcasts
+LIVE_SEND_QUEUE = 8  # /ws/live frames buffered per client before it is resynced
+MAX_SEND_WAIT = 2.0  # seconds one frame send may take before the client is dropped
 
-def _use_arduino_mode() -> bool:
-    """Use Arduino mode if SIMULATE=1, SERIAL_PORT is set, or Arduino auto-detected."""
+# /api/map fields fixed at engine init, encoded once as JSON object members (no braces)
+_static_map_json: bytes = b""
+
+# Room analytics memo: (heatmap_version, rooms); refreshed at ANALYTICS_INTERVAL, and only
+# recomputed when the heatmap changed
+_rooms_cache: tuple[int, list[dict] | None] = (-1, None)
+_analytics_task: asyncio.Task | None = None
+ANALYTICS_INTERVAL = 1.0  # seconds
+# Per-process ETag prefix: heatmap versions restart at 0, so a bare version from a
+# previous run could match and wrongly revalidate
+_BOOT_ID = os.urandom(4).hex()
+
+
+def _dumps(obj) -> bytes:
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _send_bounded(ws: WebSocket, buf: bytes):
+    """send_bytes that raises TimeoutError instead of waiting on a stalled client forever."""
+    return asyncio.wait_for(ws.send_bytes(buf), MAX_SEND_WAIT)
+
+
+async def _close_quietly(ws: WebSocket) -> None:
+    """Best-effort close of a dropped client; its handler then sees the disconnect."""
+    try:
+        await asyncio.wait_for(ws.close(), MAX_SEND_WAIT)
+    except Exception:
+        pass
+
+
+def _enqueue_all(buf: bytes, clients: dict[WebSocket, asyncio.Queue[bytes]]) -> None:
+    """Queue one frame for every client's writer; never waits on a slow socket."""
+    # No awaits here, so the registry can't change mid-loop; iterate it without a copy
+    for queue in clients.values():
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(buf)
+
+
+async def _ws_writer(
+    ws: WebSocket, queue: asyncio.Queue[bytes], registry: dict[WebSocket, asyncio.Queue[bytes]]
+) -> None:
+    """Send queued frames to one client; a failed or stalled send unregisters it."""
+    try:
+        while True:
+            await _send_bounded(ws, await queue.get())
+    except Exception:
+        registry.pop(ws, None)
+        await _close_quietly(ws)
+
+
+async def _wait_for_disconnect(ws: WebSocket) -> None:
+    """Return once the client goes away. Dashboards never send, so any inbound frame is
+    discarded without decoding; uvicorn's ping keepalive turns a dead peer into a disconnect."""
+    while (await ws.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+async def _tick(deadline: float, interval: float) -> float:
+    """Sleep until deadline + interval (loop clock) and return that as the new deadline.
+
+    Keeps a fixed rate regardless of how long each iteration's work took. If the work
+    overran a whole period the schedule restarts from now instead of bursting to catch up.
+    """
+    now = asyncio.get_running_loop().time()
+    deadline = max(deadline + interval, now)
+    await asyncio.sleep(deadline - now)
+    return deadline
+
+
+def _use_arduino_mode() -> tuple[bool, str | None]:
+    """Use Arduino mode if SIMULATE=1, SERIAL_PORT is set, or Arduino auto-detected.
+
+    Returns (arduino_mode, detected_port) so the slow serial-port probe runs at most once.
+    """
     simulate = int(os.environ.get("SIMULATE", "0"))
     if simulate == 1:
-        return True
+        return True, None
     if os.environ.get("SERIAL_PORT"):
-        return True
+        return True, None
     try:
-        from src.serial_reader import find_arduino_uno_port
-        if find_arduino_uno_port():
-            return True
+        port = find_arduino_uno_port()
+        if port:
+            return True, port
     except Exception:
         pass
-    return False
+    return False, None
 
 
 def _robot_state_from_connection(conn):
-    from src.path_planning import RobotState
-
     rs = conn.robot_state
     return RobotState(
         x=rs.x,
@@ -88,57 +186,88 @@ def _robot_state_from_connection(conn):
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global engine, _sim_task, _arduino_sim_task, _arduino_serial_task
+    global engine, _static_map_json, _sim_task, _live_task, _analytics_task
+    global _arduino_sim_task, _arduino_serial_task
     global _arduino_serial_thread, _arduino_serial_stop
     global _arduino_last_update, _latest_arduino_update
 
     # Always run simulation engine (robots 1, 2, 3)
     engine = SimulationEngine()
+    hr, hc = engine.get_heatmap_shape()
+    _static_map_json = _dumps({
+        "grid": engine.get_grid(),
+        "rows": engine.floorplan.rows,
+        "cols": engine.floorplan.cols,
+        "heatmap_rows": hr,
+        "heatmap_cols": hc,
+        "obstacle_cells": engine.get_obstacle_cells(),
+    })[1:-1]
     _sim_task = asyncio.create_task(engine.run_loop())
+    _analytics_task = asyncio.create_task(_analytics_loop())
+    _live_task = asyncio.create_task(_live_broadcast_loop())
     logger.info("Simulation engine started (3 robots)")
 
     running = True
-    if _use_arduino_mode():
-        from src.arduino_connection import get_connection
-        from src.fake_sensors import generate_fake_payload
-        from src.serial_reader import run_serial_reader, find_arduino_uno_port
-
-        serial_port = os.environ.get("SERIAL_PORT") or find_arduino_uno_port()
+    arduino_mode, detected_port = _use_arduino_mode()
+    if arduino_mode:
+        serial_port = os.environ.get("SERIAL_PORT") or detected_port
         serial_baud = int(os.environ.get("SERIAL_BAUD", "115200"))
         running = True
 
         logger.info("Arduino mode: SERIAL_PORT=%s, SIMULATE=%s", serial_port or "(auto)", os.environ.get("SIMULATE", "0"))
+        if os.environ.get("WARMUP_NUMBA", "1") == "1":
+            # Off the event loop so the simulation keeps ticking while kernels compile
+            t0 = time.perf_counter()
+            await asyncio.to_thread(warm_up_jit)
+            logger.info("Arduino JIT kernels ready in %.2fs", time.perf_counter() - t0)
 
         if int(os.environ.get("SIMULATE", "0")) == 1:
             async def _demo_loop():
                 global _arduino_last_update, _latest_arduino_update
                 conn = get_connection()
                 ts = 0
+                deadline = asyncio.get_running_loop().time()
                 while running:
                     robot = _robot_state_from_connection(conn)
                     payload = generate_fake_payload(robot, timestamp_ms=ts, include_thermal=True)
                     update = conn.receive_readings(payload)
-                    _latest_arduino_update = update.model_dump()
+                    # Wire bytes straight from pydantic-core, as the serial reader does;
+                    # the dict form is only dumped if something reads it
+                    raw = update.model_dump_json().encode()
+                    _latest_arduino_update = update
                     _arduino_last_update = time.time()
-                    msg = json.dumps(_latest_arduino_update)
-                    for ws in list(ws_connections):
-                        try:
-                            await ws.send_text(msg)
-                        except Exception:
-                            pass
+                    _enqueue_all(raw, ws_connections)
+                    engine.state_changed.set()
                     ts += 500
-                    await asyncio.sleep(0.5)
+                    deadline = await _tick(deadline, 0.5)
 
             _arduino_sim_task = asyncio.create_task(_demo_loop())
             logger.info("Arduino demo (SIMULATE=1) started")
 
         elif serial_port:
-            update_queue: Queue = Queue()
+            # Serial thread appends to a bounded deque and wakes the loop only when no
+            # wakeup is already pending, so bursts cost one self-pipe write, not one each
+            pending_updates: deque[tuple[bytes, FrontendUpdate]] = deque(maxlen=64)
+            updates_ready = asyncio.Event()
+            wakeup_pending = False
+            loop = asyncio.get_running_loop()
+
+            dropped_frames = 0  # stale updates skipped; only the newest is worth broadcasting
+
+            def _publish(item: tuple[bytes, FrontendUpdate]) -> None:
+                nonlocal dropped_frames, wakeup_pending
+                if len(pending_updates) == pending_updates.maxlen:
+                    dropped_frames += 1
+                pending_updates.append(item)
+                if not wakeup_pending:
+                    wakeup_pending = True
+                    loop.call_soon_threadsafe(updates_ready.set)
+
             conn = get_connection()
             _arduino_serial_stop = threading.Event()
             _arduino_serial_thread = threading.Thread(
                 target=run_serial_reader,
-                args=(serial_port, serial_baud, conn, update_queue, _arduino_serial_stop),
+                args=(serial_port, serial_baud, conn, _publish, _arduino_serial_stop),
                 daemon=True,
             )
             _arduino_serial_thread.start()
@@ -146,19 +275,28 @@ async def lifespan(app: FastAPI):
 
             async def _serial_broadcast_loop():
                 global _arduino_last_update, _latest_arduino_update
+                nonlocal dropped_frames, wakeup_pending
+                last_drop_log = time.time()
                 while running:
                     try:
-                        msg = await asyncio.to_thread(update_queue.get)
-                        try:
-                            _latest_arduino_update = json.loads(msg)
-                            _arduino_last_update = time.time()
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-                        for ws in list(ws_connections):
-                            try:
-                                await ws.send_text(msg)
-                            except Exception:
-                                pass
+                        await updates_ready.wait()
+                        updates_ready.clear()
+                        # Clear before draining: a publish racing with the drain re-arms the wakeup
+                        wakeup_pending = False
+                        if not pending_updates:
+                            continue
+                        # Coalesce any backlog: broadcast only the freshest update
+                        raw, _latest_arduino_update = pending_updates.popleft()
+                        while pending_updates:
+                            raw, _latest_arduino_update = pending_updates.popleft()
+                            dropped_frames += 1
+                        _arduino_last_update = time.time()
+                        _enqueue_all(raw, ws_connections)
+                        engine.state_changed.set()
+                        if dropped_frames and time.time() - last_drop_log >= SERIAL_DROP_LOG_INTERVAL:
+                            logger.info("Serial broadcast skipped %d stale updates", dropped_frames)
+                            dropped_frames = 0
+                            last_drop_log = time.time()
                     except asyncio.CancelledError:
                         break
 
@@ -173,6 +311,13 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     running = False
+    for task in (_live_task, _analytics_task):
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
     if _arduino_sim_task is not None:
         _arduino_sim_task.cancel()
         try:
@@ -223,21 +368,21 @@ def _arduino_connected() -> bool:
 @app.get("/api/robots")
 def get_robots():
     names = engine.get_robot_names()
-    robots = []
+    entries = []  # (sort key, robot): active first, then most recently seen
     for rid in engine.get_robot_ids():
         state = engine.get_current_state(rid)
         active = _arduino_connected() if rid == PHYSICAL_ROBOT_ID else engine.is_robot_active(rid)
         last_seen = state.timestamp if state else None
         if rid == PHYSICAL_ROBOT_ID and _arduino_connected():
             last_seen = time.time()
-        robots.append({
+        entries.append(((not active, -(last_seen or 0)), {
             "id": rid,
             "name": names.get(rid, rid),
             "active": active,
             "last_seen": last_seen,
-        })
-    robots.sort(key=lambda r: (0 if r["active"] else 1, -(r["last_seen"] or 0)))
-    return {"robots": robots}
+        }))
+    entries.sort(key=itemgetter(0))
+    return {"robots": [robot for _, robot in entries]}
 
 
 @app.get("/api/current")
@@ -254,90 +399,96 @@ def get_current(robot_id: str | None = None):
                 rid = r
                 break
         rid = rid or engine.get_robot_ids()[0]
-    if rid == PHYSICAL_ROBOT_ID and _latest_arduino_update:
-        u = _latest_arduino_update
+    if rid == PHYSICAL_ROBOT_ID and _latest_arduino_update is not None:
+        u = _arduino_update_dict()
         robot = u.get("robot") or {}
         # Physical robot is stationary; fix 3D position to arena center
         floor_x, floor_y = _arduino_to_floor_position(0, 0)
         return {
             "robot_id": rid,
-            "position": {"x": floor_x, "y": floor_y, "theta": robot.get("heading_deg", 0) * 3.14159 / 180},
+            "position": {"x": floor_x, "y": floor_y, "theta": radians(robot.get("heading_deg", 0))},
             "temperature_c": u.get("air_temp_c"),
             "humidity_percent": u.get("humidity_pct"),
             "room_id": "corridor",
             "room_name": "Corridor",
         }
-    s = engine.get_current_state(rid)
-    if s:
-        d = s.to_dict()
-        d["robot_id"] = rid
-        d["room_name"] = get_room_name(d.get("room_id"))
-        return d
+    snapshot_json = engine.get_snapshot_json(rid)
+    if snapshot_json:
+        # Splice robot_id into the per-step encoded snapshot instead of re-encoding it
+        return Response(
+            b'{"robot_id":' + _dumps(rid) + b"," + snapshot_json[1:], media_type="application/json"
+        )
     return {"message": "No data yet"}
 
 
+def _refresh_room_analytics() -> None:
+    """Recompute room analytics if the heatmap changed since the cached result."""
+    global _rooms_cache
+    version = engine.get_heatmap_version()
+    cached_version, rooms = _rooms_cache
+    if rooms is None or cached_version != version:
+        rooms = compute_room_analytics(engine.get_heatmap_sums(), engine.get_grid_np(), heatmap_subdiv=4)
+        _rooms_cache = (version, rooms)
+
+
+def _room_analytics() -> tuple[int, list[dict]]:
+    """Latest (heatmap_version, rooms), refreshed every ANALYTICS_INTERVAL by _analytics_loop."""
+    if _rooms_cache[1] is None:
+        _refresh_room_analytics()
+    return _rooms_cache
+
+
+async def _analytics_loop():
+    while True:
+        _refresh_room_analytics()
+        await asyncio.sleep(ANALYTICS_INTERVAL)
+
+
 @app.get("/api/rooms")
-def get_rooms():
-    grid = engine.get_grid()
-    heatmap = engine.get_heatmap_data()
-    rooms = compute_room_analytics(heatmap, grid, heatmap_subdiv=4)
+def get_rooms(request: Request, response: Response):
+    version, rooms = _room_analytics()
+    etag = f'"{_BOOT_ID}-{version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return {"rooms": rooms}
 
 
+_EMPTY_ARDUINO_MAP = {
+    "grid": DEFAULT_GRID,
+    "trail": [],
+    "heatmap_cells": {},
+    "heatmap_rows": 0,
+    "heatmap_cols": 0,
+    "occupancy_grid": None,
+    "occupancy_bounds": None,
+    "obstacle_points": [],
+    "obstacle_cells": _OBSTACLE_CELLS_LIST,
+    "point_cloud": [],
+    "rows": len(DEFAULT_GRID),
+    "cols": len(DEFAULT_GRID[0]) if DEFAULT_GRID else 0,
+}
+
+
 def _arduino_map_response(robot_id: str | None = None) -> dict:
     """Build /api/map response from Arduino connection when in Arduino mode."""
-    from simulation.floorplan import DEFAULT_GRID, OBSTACLE_CELLS
-    empty = {
-        "grid": DEFAULT_GRID,
-        "trail": [],
-        "heatmap_cells": {},
-        "heatmap_rows": 0,
-        "heatmap_cols": 0,
-        "occupancy_grid": None,
-        "occupancy_bounds": None,
-        "obstacle_points": [],
-        "obstacle_cells": [[r, c] for r, c in OBSTACLE_CELLS],
-        "point_cloud": [],
-        "rows": len(DEFAULT_GRID),
-        "cols": len(DEFAULT_GRID[0]) if DEFAULT_GRID else 0,
-    }
-    if robot_id != PHYSICAL_ROBOT_ID or not _latest_arduino_update:
-        return empty
-    u = _latest_arduino_update
+    if robot_id != PHYSICAL_ROBOT_ID or _latest_arduino_update is None:
+        return dict(_EMPTY_ARDUINO_MAP)
+    u = _arduino_update_dict()
     occ = u.get("occupancy_grid")
-    bounds = u.get("occupancy_bounds") or (-5.0, 5.0, -5.0, 5.0)
-    occ_bounds = list(bounds) if bounds else [-5.0, 5.0, -5.0, 5.0]
+    occ_bounds = u.get("occupancy_bounds") or (-5.0, 5.0, -5.0, 5.0)
     heatmap_cells = u.get("heatmap_cells")
     if not isinstance(heatmap_cells, dict):
         thermal = u.get("thermal_grid")
-        heatmap_cells = {}
-        if isinstance(thermal, list):
-            for r, row in enumerate(thermal):
-                if isinstance(row, (list, tuple)):
-                    for c, val in enumerate(row):
-                        if isinstance(val, (int, float)):
-                            heatmap_cells[f"{r},{c}"] = float(val)
+        heatmap_cells = _thermal_heatmap_cells(thermal) if isinstance(thermal, list) else {}
     hr = len(occ) if isinstance(occ, list) and occ else 0
     hc = len(occ[0]) if isinstance(occ, list) and occ and occ[0] else 0
     obstacle_points = []
-    if isinstance(occ, list) and occ and len(bounds) >= 4:
-        x_min, x_max, y_min, y_max = bounds[0], bounds[1], bounds[2], bounds[3]
+    if isinstance(occ, list) and occ and len(occ_bounds) >= 4:
+        x_min, x_max, y_min, y_max = occ_bounds[0], occ_bounds[1], occ_bounds[2], occ_bounds[3]
         res = (x_max - x_min) / hc if hc else 0.2
-        for r, row in enumerate(occ):
-            if not isinstance(row, (list, tuple)):
-                continue
-            for c, val in enumerate(row):
-                if isinstance(val, (int, float)) and val > 0.7:
-                    wx = x_min + (c + 0.5) * res
-                    wy = y_min + (r + 0.5) * res
-                    fx, fy = _arduino_to_floor_position(wx, wy)
-                    obstacle_points.append([fx, 0.15, fy])
-    raw_points = u.get("points") or []
-    point_cloud = []
-    for p in raw_points:
-        if isinstance(p, (list, tuple)) and len(p) >= 3:
-            fx, fy = _arduino_to_floor_position(float(p[0]), float(p[2]))
-            point_cloud.append([fx, float(p[1]), fy])
+        obstacle_points = _occupancy_obstacle_points(occ, x_min, y_min, res)
+    point_cloud = _arduino_point_cloud(u.get("points") or [])
     return {
         "grid": DEFAULT_GRID,
         "trail": [],
@@ -349,7 +500,7 @@ def _arduino_map_response(robot_id: str | None = None) -> dict:
         "occupancy_grid": occ,
         "occupancy_bounds": occ_bounds,
         "obstacle_points": obstacle_points,
-        "obstacle_cells": [[r, c] for r, c in OBSTACLE_CELLS],
+        "obstacle_cells": _OBSTACLE_CELLS_LIST,
         "point_cloud": point_cloud,
     }
 
@@ -359,40 +510,28 @@ def get_map(robot_id: str | None = None):
     if robot_id and robot_id not in engine.get_robot_ids():
         robot_id = engine.get_robot_ids()[0]
     rid = robot_id or engine.get_robot_ids()[0]
-    if rid == PHYSICAL_ROBOT_ID and _latest_arduino_update:
+    if rid == PHYSICAL_ROBOT_ID and _latest_arduino_update is not None:
         return _arduino_map_response(rid)
-    hr, hc = engine.get_heatmap_shape()
     slam = engine._slams[rid]
     occ_bounds = slam.get_occupancy_bounds()
-    return {
-        "grid": engine.get_grid(),
+    dynamic = _dumps({
         "trail": engine.get_trail(rid),
         "heatmap_cells": engine.get_heatmap_cells(),
-        "rows": engine.floorplan.rows,
-        "cols": engine.floorplan.cols,
-        "heatmap_rows": hr,
-        "heatmap_cols": hc,
         "occupancy_grid": slam.get_occupancy_grid(),
-        "occupancy_bounds": list(occ_bounds),
+        "occupancy_bounds": occ_bounds,
         "obstacle_points": engine.get_obstacle_points(rid),
-        "obstacle_cells": engine.get_obstacle_cells(),
         "point_cloud": engine.get_simulated_point_cloud(rid),
-    }
+    })
+    # Splice the precomputed static members into the per-request object
+    return Response(b"{" + _static_map_json + b"," + dynamic[1:], media_type="application/json")
 
 
 @app.post("/arduino/readings")
 async def arduino_readings(payload: ArduinoReadingsPayload):
-    from src.arduino_connection import get_connection
-
     conn = get_connection()
     update = conn.receive_readings(payload)
 
-    msg = update.model_dump_json()
-    for ws in list(ws_connections):
-        try:
-            await ws.send_text(msg)
-        except Exception:
-            pass
+    _enqueue_all(update.model_dump_json().encode(), ws_connections)
 
     return {"status": "ok"}
 
@@ -401,52 +540,103 @@ async def arduino_readings(payload: ArduinoReadingsPayload):
 async def websocket_arduino(websocket: WebSocket):
     await websocket.accept()
 
-    ws_connections.append(websocket)
+    queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=WS_SEND_QUEUE)
+    ws_connections[websocket] = queue
+    writer = asyncio.create_task(_ws_writer(websocket, queue, ws_connections))
 
     try:
-        from src.arduino_connection import get_connection
-
         conn = get_connection()
         state = conn.get_current_state()
-        await websocket.send_text(state.model_dump_json())
+        queue.put_nowait(state.model_dump_json().encode())
 
-        while True:
-            await websocket.receive_text()
-
-    except WebSocketDisconnect:
-        pass
+        await _wait_for_disconnect(websocket)
 
     finally:
-        if websocket in ws_connections:
-            ws_connections.remove(websocket)
+        ws_connections.pop(websocket, None)
+        writer.cancel()
 
 
 def _arduino_to_floor_position(arduino_x: float, arduino_y: float) -> tuple[float, float]:
     """Map Arduino meter coords [-5,5] to floor grid coords [0,cols] x [0,rows].
-    Center (0,0) in Arduino space maps to arena center (cols/2, rows/2)."""
-    from simulation.floorplan import DEFAULT_GRID
-    rows = len(DEFAULT_GRID)
-    cols = len(DEFAULT_GRID[0]) if DEFAULT_GRID else 1
-    floor_x = (arduino_x + 5.0) / 10.0 * cols
-    floor_y = (arduino_y + 5.0) / 10.0 * rows
-    return floor_x, floor_y
+    Center (0,0) in Arduino space maps to arena center (cols/2, rows/2).
+    Also works elementwise on NumPy arrays."""
+    return (arduino_x + 5.0) / 10.0 * _FLOOR_COLS, (arduino_y + 5.0) / 10.0 * _FLOOR_ROWS
+
+
+@lru_cache(maxsize=8)
+def _cell_keys(rows: int, cols: int) -> tuple[str, ...]:
+    """Row-major interned "r,c" heatmap keys for a rows x cols grid."""
+    return tuple(sys.intern(f"{r},{c}") for r in range(rows) for c in range(cols))
+
+
+def _thermal_heatmap_cells(thermal) -> dict[str, float]:
+    """{"r,c": temp} for a 2D thermal grid; missing (None) values are skipped."""
+    try:
+        arr = np.asarray(thermal, dtype=np.float64)
+    except (TypeError, ValueError):
+        arr = None
+    if arr is None or arr.ndim != 2:
+        # Ragged or partly non-numeric grid: keep only the well-formed cells
+        return {
+            f"{r},{c}": float(val)
+            for r, row in enumerate(thermal) if isinstance(row, (list, tuple))
+            for c, val in enumerate(row) if isinstance(val, (int, float)) and val == val
+        }
+    keys = _cell_keys(*arr.shape)
+    flat = arr.ravel()
+    valid = ~np.isnan(flat)
+    if valid.all():
+        return dict(zip(keys, flat.tolist()))
+    return {keys[i]: v for i, v in zip(np.flatnonzero(valid).tolist(), flat[valid].tolist())}
+
+
+def _occupancy_obstacle_points(occ, x_min: float, y_min: float, res: float) -> list[list[float]]:
+    """[x, 0.15, y] floor coords for every occupancy cell above 0.7."""
+    try:
+        occ_np = np.asarray(occ, dtype=np.float64)
+    except (TypeError, ValueError):
+        occ_np = None
+    if occ_np is not None and occ_np.ndim == 2:
+        rs, cs = np.nonzero(occ_np > 0.7)
+    else:
+        # Ragged or partly non-numeric grid: keep only the well-formed cells
+        hits = [
+            (r, c)
+            for r, row in enumerate(occ) if isinstance(row, (list, tuple))
+            for c, val in enumerate(row) if isinstance(val, (int, float)) and val > 0.7
+        ]
+        rs, cs = np.array(hits, dtype=np.intp).reshape(-1, 2).T
+    fx, fy = _arduino_to_floor_position(x_min + (cs + 0.5) * res, y_min + (rs + 0.5) * res)
+    return np.stack([fx, np.full_like(fx, 0.15), fy], axis=1).tolist()
+
+
+def _arduino_point_cloud(raw_points) -> list[list[float]]:
+    """Arduino [x, y, z] meter points mapped to floor coords [fx, y, fy]."""
+    try:
+        pts = np.asarray(raw_points, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Ragged input: keep only well-formed points
+        pts = np.asarray(
+            [p[:3] for p in raw_points if isinstance(p, (list, tuple)) and len(p) >= 3],
+            dtype=np.float64,
+        )
+    if pts.ndim != 2 or pts.shape[1] < 3:
+        return []
+    fx, fy = _arduino_to_floor_position(pts[:, 0], pts[:, 2])
+    return np.stack([fx, pts[:, 1], fy], axis=1).tolist()
 
 
 def _frontend_update_to_robot_update(update: dict) -> dict:
     """Map Arduino FrontendUpdate dict to robot_update schema for /ws/live."""
     robot = update.get("robot") or {}
     heading_deg = robot.get("heading_deg", 0)
-    theta = heading_deg * 3.14159265359 / 180.0  # deg to rad
+    theta = radians(heading_deg)
     heatmap_cells = update.get("heatmap_cells")
     if not isinstance(heatmap_cells, dict):
         heatmap_cells = {}
     thermal_grid = update.get("thermal_grid")
     if isinstance(thermal_grid, list) and thermal_grid and not heatmap_cells:
-        for r, row in enumerate(thermal_grid):
-            if isinstance(row, (list, tuple)):
-                for c, val in enumerate(row):
-                    if isinstance(val, (int, float)):
-                        heatmap_cells[f"{r},{c}"] = float(val)
+        heatmap_cells = _thermal_heatmap_cells(thermal_grid)
     occ = update.get("occupancy_grid")
     hr, hc = 0, 0
     if isinstance(occ, list) and occ:
@@ -459,24 +649,11 @@ def _frontend_update_to_robot_update(update: dict) -> dict:
     res = 0.2 if (hr and hc) else 0.2
     if hr and hc:
         res = (x_max - x_min) / hc if hc else 0.2
-    raw_points = update.get("points") or []
     obstacle_points = []
     if isinstance(occ, list) and occ:
-        for r, row in enumerate(occ):
-            if not isinstance(row, (list, tuple)):
-                continue
-            for c, val in enumerate(row):
-                if isinstance(val, (int, float)) and val > 0.7:
-                    wx = x_min + (c + 0.5) * res
-                    wy = y_min + (r + 0.5) * res
-                    fx, fy = _arduino_to_floor_position(wx, wy)
-                    obstacle_points.append([fx, 0.15, fy])
+        obstacle_points = _occupancy_obstacle_points(occ, x_min, y_min, res)
     # Transform point cloud from Arduino meter space to floor grid coords (relative to robot)
-    point_cloud = []
-    for p in raw_points:
-        if isinstance(p, (list, tuple)) and len(p) >= 3:
-            fx, fy = _arduino_to_floor_position(float(p[0]), float(p[2]))
-            point_cloud.append([fx, float(p[1]), fy])
+    point_cloud = _arduino_point_cloud(update.get("points") or [])
     trail: list[list[float]] = []
     # Physical robot is stationary; fix 3D position to arena center
     floor_x, floor_y = _arduino_to_floor_position(0, 0)
@@ -499,45 +676,164 @@ def _frontend_update_to_robot_update(update: dict) -> dict:
     }
 
 
+def _arduino_update_dict() -> dict | None:
+    """_latest_arduino_update as a dict, dumped at most once per update and only on demand."""
+    global _arduino_dict_cache
+    update = _latest_arduino_update
+    if update is None:
+        return None
+    if _arduino_dict_cache[0] is not update:
+        _arduino_dict_cache = (update, update.model_dump())
+    return _arduino_dict_cache[1]
+
+
+def _arduino_live_frame() -> bytes:
+    """Encoded robot_update for the physical robot, rebuilt only when a new update arrives."""
+    global _arduino_frame_cache
+    update = _latest_arduino_update
+    if _arduino_frame_cache[0] is not update:
+        _arduino_frame_cache = (update, _dumps(_frontend_update_to_robot_update(_arduino_update_dict())))
+    return _arduino_frame_cache[1]
+
+
+def _live_cursor() -> tuple[int, dict[str, int], FrontendUpdate | None]:
+    """Current (heatmap version, per-robot trail count, Arduino update); what a client has after this tick."""
+    return (
+        engine.get_heatmap_version(),
+        {rid: engine.get_trail_count(rid) for rid in ROBOT_IDS},
+        _latest_arduino_update,
+    )
+
+
+def _live_robot_frames(since: tuple[int, dict[str, int], FrontendUpdate | None] | None) -> list[bytes]:
+    """Serialize one robot_update object per robot for the current tick.
+
+    With since=None each update is a full snapshot (trail, heatmap_cells). Otherwise updates
+    carry only what changed after that cursor: trail_append/trail_len and heatmap_delta, and
+    the physical robot is left out until a new Arduino update arrives.
+    """
+    frames: list[bytes] = []
+    # Shared by every simulated robot this tick
+    if since is None:
+        heatmap = {"heatmap_cells": engine.get_heatmap_cells()}
+    else:
+        heatmap = {"heatmap_delta": engine.get_heatmap_cells_since(since[0])}
+    heatmap["heatmap_rows"], heatmap["heatmap_cols"] = engine.get_heatmap_shape()
+    for rid in ROBOT_IDS:
+        if rid == PHYSICAL_ROBOT_ID:
+            # Arduino reports every ~500 ms; don't resend an unchanged update every tick
+            if _latest_arduino_update is not None and (
+                since is None or since[2] is not _latest_arduino_update
+            ):
+                frames.append(_arduino_live_frame())
+            continue
+        snapshot_json = engine.get_snapshot_json(rid)
+        slam = engine._slams.get(rid)
+        if snapshot_json and slam:
+            if since is None:
+                trail = {"trail": engine.get_trail(rid)}
+            else:
+                appended, trail_len = engine.get_trail_since(rid, since[1].get(rid, 0))
+                trail = {"trail_append": appended, "trail_len": trail_len}
+            rest = _dumps({
+                **trail,
+                "obstacle_points": engine.get_obstacle_points(rid),
+                "point_cloud": engine.get_simulated_point_cloud(rid),
+                **heatmap,
+            })
+            # State fields come pre-encoded from the engine; splice them in
+            frames.append(b"".join((
+                b'{"type":"robot_update","robot_id":', _dumps(rid), b",",
+                snapshot_json[1:-1], b",", rest[1:],
+            )))
+    return frames
+
+
+def _tick_frame(analytics_json: bytes, robot_frames: list[bytes]) -> bytes:
+    """One /ws/live message per tick: {"type": "tick", "analytics": [...], "robots": [...]}.
+
+    Parts are already orjson-encoded, so they are spliced rather than re-serialized.
+    """
+    return b"".join((
+        b'{"type":"tick","analytics":', analytics_json,
+        b',"robots":[', b",".join(robot_frames), b"]}",
+    ))
+
+
+async def _live_broadcast_loop():
+    """Build each /ws/live tick frame once and fan the bytes out to every subscriber.
+
+    Clients that already got the previous tick receive deltas against it; new clients
+    get a full snapshot first. Ticks are driven by engine.state_changed and capped at
+    one per LIVE_INTERVAL, so nothing is sent while state is static.
+
+    Frames are queued per client, so a slow peer never holds up the others. Deltas must
+    all arrive, so instead of dropping frames a client whose queue is full has it cleared
+    and is resynced with a full snapshot on the next tick.
+    """
+    analytics_version, analytics_json = -1, b"[]"
+    cursor: tuple[int, dict[str, int], FrontendUpdate | None] | None = None
+    synced: set[WebSocket] = set()
+    deadline = asyncio.get_running_loop().time()
+    while True:
+        await engine.state_changed.wait()
+        engine.state_changed.clear()
+        if live_connections:
+            # No awaits until the next tick, so the registry can't change while it is used
+            fresh = [ws for ws in live_connections if ws not in synced]
+            current = [ws for ws in live_connections if ws in synced]
+            version, rooms = _room_analytics()
+            if version != analytics_version:
+                analytics_version = version
+                analytics_json = _dumps(rooms or [])
+            full = _tick_frame(analytics_json, _live_robot_frames(None)) if fresh else b""
+            delta = _tick_frame(analytics_json, _live_robot_frames(cursor)) if current else b""
+            cursor = _live_cursor()
+            synced = set(live_connections)
+            for ws in fresh:
+                live_connections[ws].put_nowait(full)
+            for ws in current:
+                queue = live_connections[ws]
+                if queue.full():
+                    while not queue.empty():
+                        queue.get_nowait()
+                    synced.discard(ws)
+                    engine.state_changed.set()  # resync it next tick even if nothing moves
+                else:
+                    queue.put_nowait(delta)
+        else:
+            synced.clear()
+        deadline = await _tick(deadline, LIVE_INTERVAL)
+
+
 @app.websocket("/ws/live")
 async def websocket_live(ws: WebSocket):
     await ws.accept()
+    queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=LIVE_SEND_QUEUE)
+    live_connections[ws] = queue
+    writer = asyncio.create_task(_ws_writer(ws, queue, live_connections))
+    engine.state_changed.set()  # send the new client its snapshot without waiting for a step
     try:
-        while True:
-            grid = engine.get_grid()
-            heatmap = engine.get_heatmap_data()
-            rooms = compute_room_analytics(heatmap, grid, heatmap_subdiv=4)
-            await ws.send_json({"type": "analytics", "rooms": rooms})
-            for rid in ROBOT_IDS:
-                if rid == PHYSICAL_ROBOT_ID:
-                    if _latest_arduino_update:
-                        msg = _frontend_update_to_robot_update(_latest_arduino_update)
-                        await ws.send_json(msg)
-                    continue
-                state = engine.get_current_state(rid)
-                slam = engine._slams.get(rid)
-                if state and slam:
-                    d = state.to_dict()
-                    d["room_name"] = get_room_name(d.get("room_id"))
-                    msg = {
-                        "type": "robot_update",
-                        "robot_id": rid,
-                        **d,
-                        "trail": engine.get_trail(rid),
-                        "obstacle_points": engine.get_obstacle_points(rid),
-                        "point_cloud": engine.get_simulated_point_cloud(rid),
-                        "heatmap_cells": engine.get_heatmap_cells(),
-                        "heatmap_rows": engine.get_heatmap_shape()[0],
-                        "heatmap_cols": engine.get_heatmap_shape()[1],
-                    }
-                    await ws.send_json(msg)
-            await asyncio.sleep(0.15)
-    except WebSocketDisconnect:
-        pass
+        await _wait_for_disconnect(ws)
+    finally:
+        live_connections.pop(ws, None)
+        writer.cancel()
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    # Use 0.0.0.0 so Arduino host can reach the backend
-    uvicorn.run("main:app", host="0.0.0.0", port=8000)
+    # Use 0.0.0.0 so Arduino host can reach the backend.
+    # loop/http "auto" pick uvloop + httptools when installed (uvicorn[standard]; no uvloop on
+    # Windows). RELOAD=1 enables autoreload for development.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        reload=os.environ.get("RELOAD") == "1",
+        # Keepalive pings detect half-open WebSockets; handlers only wait for the disconnect
+        ws_ping_interval=20.0,
+        ws_ping_timeout=20.0,
+    )
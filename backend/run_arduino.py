@@ -28,4 +28,13 @@ elif not os.environ.get("SERIAL_PORT"):
         print(f"Could not auto-detect: {e}")
 
 import uvicorn
-uvicorn.run("main:app", host="0.0.0.0", port=8000)
+uvicorn.run(
+    "main:app",
+    host="0.0.0.0",
+    port=8000,
+    loop="auto",
+    http="auto",
+    reload=os.environ.get("RELOAD") == "1",
+    ws_ping_interval=20.0,
+    ws_ping_timeout=20.0,
+)
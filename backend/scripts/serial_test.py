@@ -3,10 +3,11 @@
 Serial diagnostic: list ports, test Arduino communication.
 Run from backend/: python scripts/serial_test.py [COM3]
 """
-import json
 import sys
 import time
 
+import orjson
+
 def main():
     try:
         import serial
@@ -41,35 +42,34 @@ def main():
         print("Close Arduino Serial Monitor and any other program using the port.")
         sys.exit(1)
 
-    buffer = ""
+    buffer = bytearray()
     start = time.monotonic()
     line_count = 0
 
     while time.monotonic() - start < 5:
-        chunk = ser.read(ser.in_waiting or 100)
-        if chunk:
-            buffer += chunk.decode("utf-8", errors="ignore")
+        # Everything already buffered, else block (up to timeout) for the next byte
+        chunk = ser.read(ser.in_waiting or 1)
+        buffer += chunk
 
-        while "\n" in buffer:
-            line, _, buffer = buffer.partition("\n")
-            line = line.strip().rstrip("\r")
-            if not line:
+        while b"\n" in buffer:
+            line, _, buffer = buffer.partition(b"\n")
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            if not line.strip():
                 continue
             line_count += 1
             print(f"\n--- Line {line_count} ({len(line)} chars) ---")
-            if line.startswith("{"):
+            if line[:1] == b"{":
                 try:
-                    data = json.loads(line)
+                    data = orjson.loads(line)
                     print(f"JSON OK: timestamp_ms={data.get('timestamp_ms')}, readings={len(data.get('readings', []))}")
                     # Send command back
                     ser.write(b"F\n")
                     print("-> Sent: F")
-                except json.JSONDecodeError as e:
+                except orjson.JSONDecodeError as e:
                     print(f"JSON error: {e}")
             else:
-                print(f" (not JSON): {line[:80]}...")
-
-        time.sleep(0.05)
+                print(f" (not JSON): {line[:80].decode('utf-8', errors='ignore')}...")
 
     ser.close()
     print(f"\nDone. Received {line_count} lines.")
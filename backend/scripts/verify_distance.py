@@ -15,45 +15,54 @@ Usage:
   type COM3 | python scripts/verify_distance.py   # Windows
   cat /dev/ttyUSB0 | python scripts/verify_distance.py  # Linux
 """
-import json
-import math
 import os
 import sys
 
+import numpy as np
+import orjson
+
 # Add backend to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.point_cloud import polar_to_cartesian
+from src.point_cloud import polar_to_cartesian_array
 
 
-def process_line(line: str) -> None:
+def process_line(line: bytes | str) -> None:
     try:
-        data = json.loads(line.strip())
-    except json.JSONDecodeError:
+        data = orjson.loads(line)
+    except orjson.JSONDecodeError:
         return
     readings = data.get("readings", [])
     if not readings:
         return
-    dists = []
-    for r in readings:
-        angle = r.get("angle", 0)
-        dist = r.get("distance", 0)
-        dists.append(dist)
-        x, y, z = polar_to_cartesian(angle, dist, 0, 0, 0)
-        print(f"  angle={angle:6.1f}  dist={dist:6.1f} cm  ->  x={x:6.3f} y={y:6.3f} z={z:6.3f} m")
-    if dists:
-        print(f"  range: {min(dists):.1f} - {max(dists):.1f} cm")
+    n = len(readings)
+    angles = np.fromiter((r.get("angle", 0) for r in readings), dtype=np.float64, count=n)
+    dists = np.fromiter((r.get("distance", 0) for r in readings), dtype=np.float64, count=n)
+    # Convert the whole frame at once, then emit it with a single write
+    xs, ys, zs = polar_to_cartesian_array(angles, dists)
+    lines = [
+        f"  angle={angle:6.1f}  dist={dist:6.1f} cm  ->  x={x:6.3f} y={y:6.3f} z={z:6.3f} m"
+        for angle, dist, x, y, z in zip(angles.tolist(), dists.tolist(), xs.tolist(), ys.tolist(), zs.tolist())
+    ]
+    lines.append(f"  range: {dists.min():.1f} - {dists.max():.1f} cm")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
     port = os.environ.get("SERIAL_PORT")
     if port:
         import serial
-        ser = serial.Serial(port, 115200)
+        ser = serial.Serial(port, 115200, timeout=0.05)
         print(f"Reading from {port}. Ctrl+C to stop.\n")
-        for line in ser:
-            line = line.decode("utf-8", errors="ignore").strip()
-            if line.startswith("{"):
-                process_line(line)
+        # Read whatever is buffered in one call (at least one byte) and split lines ourselves,
+        # rather than one read round-trip per line
+        buf = bytearray()
+        while True:
+            buf += ser.read(ser.in_waiting or 1)
+            while b"\n" in buf:
+                line, _, buf = buf.partition(b"\n")
+                # Cheap prefix test on the raw bytes; orjson tolerates the trailing \r
+                if line[:1] == b"{":
+                    process_line(line)
     else:
         print("Reading JSON from stdin (pipe from serial, or set SERIAL_PORT)")
         for line in sys.stdin:
@@ -4,10 +4,18 @@ Each robot has own Robot, trail, SLAM grid. Shared floorplan and aggregate heatm
 """
 import time
 import asyncio
-import math
-import random
+import sys
+from collections import deque
+from functools import lru_cache
+from itertools import islice
 from dataclasses import dataclass
-from .floorplan import Floorplan, OBSTACLE_CELLS
+
+import numpy as np
+import orjson
+
+from jit import njit
+
+from .floorplan import Floorplan, OBSTACLE_CELLS, get_room_name
 from .robot import Robot
 from .sensors import SensorSimulator
 from .waypoint_controller import WaypointController
@@ -38,7 +46,56 @@ class RobotState:
 
 
 HEATMAP_SUBDIV = 4  # 4x4 per 1m cell -> 0.25m resolution for higher area resolution
+HEATMAP_WINDOW = 15  # most recent samples kept per fine cell
+TRAIL_LENGTH = 500  # most recent positions kept per robot trail
 ACTIVE_TIMEOUT = 60.0  # seconds; robot is "active" if state within this
+_OBSTACLE_CELL_LIST = [[r, c] for r, c in OBSTACLE_CELLS]  # static; built once at import
+_rng = np.random.default_rng()  # noise for simulated point clouds
+# Fine cells a robot samples: 3x3 block around it plus the four cells two steps out
+_FOOTPRINT_OFFSETS = np.array(
+    [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)] + [(-2, 0), (0, -2), (0, 2), (2, 0)],
+    dtype=np.int64,
+)
+
+
+@lru_cache(maxsize=4)
+def _ray_fan(num_rays: int) -> np.ndarray:
+    """Evenly spaced point-cloud ray angles (radians, relative to heading); shared, read-only."""
+    fan = 2 * np.pi * np.arange(num_rays) / num_rays
+    fan.flags.writeable = False
+    return fan
+
+
+@njit(cache=True)
+def _record_footprint(
+    ring, head, heat_sum, heat_sqsum, heat_n, heat_seq, fine_traversable,
+    r0, c0, offsets, temp, version,
+):
+    """Push temp into every traversable footprint cell's sample ring around fine cell (r0, c0),
+    keeping the running aggregates in step. Returns the new heatmap version."""
+    rows, cols = fine_traversable.shape
+    window = ring.shape[2]
+    temp_sq = temp * temp
+    for i in range(offsets.shape[0]):
+        fr = r0 + offsets[i, 0]
+        fc = c0 + offsets[i, 1]
+        if fr < 0 or fr >= rows or fc < 0 or fc >= cols or not fine_traversable[fr, fc]:
+            continue
+        h = head[fr, fc]
+        full = heat_n[fr, fc] == window
+        old = ring[fr, fc, h]  # oldest sample once the ring is full
+        ring[fr, fc, h] = temp
+        head[fr, fc] = (h + 1) % window
+        heat_sum[fr, fc] += temp
+        heat_sqsum[fr, fc] += temp_sq
+        heat_n[fr, fc] += 1
+        if full:
+            heat_sum[fr, fc] -= old
+            heat_sqsum[fr, fc] -= old * old
+            heat_n[fr, fc] -= 1
+        version += 1
+        heat_seq[fr, fc] = version
+    return version
 
 # robot-4 = physical slot (dead in sim, active when Arduino connects)
 ROBOT_IDS = ["robot-1", "robot-2", "robot-3", "robot-4"]
@@ -67,20 +124,40 @@ PHYSICAL_ROBOT_ID = "robot-4"
 class SimulationEngine:
     def __init__(self):
         self.floorplan = Floorplan()
+        self._grid_np = np.asarray(self.floorplan.grid, dtype=np.int16)
         self.sensors = SensorSimulator(self.floorplan)
         self.dt = 0.05
         self._running = False
-        self._heatmap_data: dict[tuple[int, int], list[float]] = {}
+        self.state_changed = asyncio.Event()  # set after each step; /ws/live waits on it
+        self._heatmap_version = 0  # bumped on every heatmap write; lets readers skip recomputation
+        self._heatmap_cells_cache: tuple[int, dict[str, float]] = (-1, {})
         self._heatmap_subdiv = HEATMAP_SUBDIV
+        # Running per-fine-cell aggregates over the sample window (sum, sum of squares, count)
+        hr, hc = self.get_heatmap_shape()
+        self._heat_sum = np.zeros((hr, hc), dtype=np.float64)
+        self._heat_sqsum = np.zeros((hr, hc), dtype=np.float64)
+        self._heat_n = np.zeros((hr, hc), dtype=np.uint32)
+        self._heat_seq = np.zeros((hr, hc), dtype=np.int64)  # heatmap version of each cell's last write
+        # Sample window per fine cell as a ring buffer; _heat_head is the next slot to write
+        self._heat_ring = np.zeros((hr, hc, HEATMAP_WINDOW), dtype=np.float64)
+        self._heat_head = np.zeros((hr, hc), dtype=np.int64)
+        self._fine_traversable = np.kron(
+            self._grid_np != 0, np.ones((HEATMAP_SUBDIV, HEATMAP_SUBDIV), dtype=bool)
+        )
+        # Interned "row,col" keys, built once instead of formatted per cell per read
+        self._heat_keys = [[sys.intern(f"{r},{c}") for c in range(hc)] for r in range(hr)]
         self._moving_obstacles = make_default_moving_obstacles(14.5, 5.0)
 
         # Per-robot structures
         self._robots: dict[str, Robot] = {}
         self._controllers: dict[str, WaypointController] = {}
         self._slams: dict[str, OccupancyGrid] = {}
-        self._state_queues: dict[str, asyncio.Queue[RobotState]] = {}
+        # Latest state per robot; each step replaces it and sets state_changed
         self._last_states: dict[str, RobotState | None] = {}
-        self._trails: dict[str, list[tuple[float, float]]] = {}
+        self._snapshots: dict[str, tuple[RobotState | None, dict | None]] = {}  # per-step to_dict cache
+        self._snapshot_json: dict[str, tuple[RobotState | None, bytes]] = {}  # same, JSON-encoded
+        self._trails: dict[str, deque[tuple[float, float]]] = {}
+        self._trail_counts: dict[str, int] = {}  # total points ever appended, survives trimming
         self._avoidance_until: dict[str, float] = {}
         self._avoidance_since: dict[str, float] = {}
         self._last_recorded_temp: dict[str, float] = {}
@@ -93,9 +170,11 @@ class SimulationEngine:
                 self.floorplan.rows, self.floorplan.cols,
                 cell_size=1.0, subdiv=HEATMAP_SUBDIV,
             )
-            self._state_queues[rid] = asyncio.Queue(maxsize=1000)
             self._last_states[rid] = None
-            self._trails[rid] = []
+            self._snapshots[rid] = (None, None)
+            self._snapshot_json[rid] = (None, b"")
+            self._trails[rid] = deque(maxlen=TRAIL_LENGTH)
+            self._trail_counts[rid] = 0
             self._avoidance_until[rid] = 0.0
             self._avoidance_since[rid] = 0.0
             self._last_recorded_temp[rid] = 20.0
@@ -120,45 +199,88 @@ class SimulationEngine:
     def get_current_state(self, robot_id: str | None = None) -> RobotState | None:
         """Get latest state for robot_id. If None, use first robot (backward compat)."""
         rid = robot_id or ROBOT_IDS[0]
-        if rid not in self._state_queues:
-            return None
-        q = self._state_queues[rid]
-        while True:
-            try:
-                s = q.get_nowait()
-                self._last_states[rid] = s
-            except asyncio.QueueEmpty:
-                break
         return self._last_states.get(rid)
 
+    def get_snapshot(self, robot_id: str | None = None) -> dict | None:
+        """Latest state as to_dict() plus room_name, rebuilt once per sim step. Shared by all
+        callers until the next step; callers must not mutate it."""
+        rid = robot_id or ROBOT_IDS[0]
+        state = self.get_current_state(rid)
+        if state is None:
+            return None
+        cached_state, snapshot = self._snapshots[rid]
+        if cached_state is not state:
+            snapshot = state.to_dict()
+            snapshot["room_name"] = get_room_name(snapshot["room_id"])
+            self._snapshots[rid] = (state, snapshot)
+        return snapshot
+
+    def get_snapshot_json(self, robot_id: str | None = None) -> bytes | None:
+        """get_snapshot() encoded as a JSON object, encoded once per sim step."""
+        rid = robot_id or ROBOT_IDS[0]
+        snapshot = self.get_snapshot(rid)
+        if snapshot is None:
+            return None
+        state = self._last_states[rid]
+        if self._snapshot_json[rid][0] is not state:
+            self._snapshot_json[rid] = (state, orjson.dumps(snapshot))
+        return self._snapshot_json[rid][1]
+
     def get_trail(self, robot_id: str | None = None) -> list[tuple[float, float]]:
         rid = robot_id or ROBOT_IDS[0]
         return list(self._trails.get(rid, []))
 
+    def get_trail_count(self, robot_id: str | None = None) -> int:
+        rid = robot_id or ROBOT_IDS[0]
+        return self._trail_counts.get(rid, 0)
+
+    def get_trail_since(
+        self, robot_id: str | None, count: int
+    ) -> tuple[list[tuple[float, float]], int]:
+        """(points appended after get_trail_count() returned `count`, current trail length)."""
+        rid = robot_id or ROBOT_IDS[0]
+        trail = self._trails.get(rid, ())
+        new = min(self._trail_counts.get(rid, 0) - count, len(trail))
+        return (list(islice(trail, len(trail) - new, None)) if new > 0 else []), len(trail)
+
     def get_heatmap_data(self) -> dict[tuple[int, int], list[float]]:
-        return dict(self._heatmap_data)
-
-    def _fine_cells_under_footprint(self, x: float, y: float) -> list[tuple[int, int]]:
-        r0, c0 = self.floorplan.world_to_fine_cell(x, y, self._heatmap_subdiv)
-        out = []
-        for dr in (-1, 0, 1):
-            for dc in (-1, 0, 1):
-                out.append((r0 + dr, c0 + dc))
-        for dr in (-2, 0, 2):
-            if dr == 0:
-                for dc in (-2, 2):
-                    out.append((r0 + dr, c0 + dc))
-            else:
-                out.append((r0 + dr, c0))
+        """Sample window per sampled fine cell, oldest first."""
+        out = {}
+        for r, c in zip(*(a.tolist() for a in np.nonzero(self._heat_n))):
+            n, h = int(self._heat_n[r, c]), int(self._heat_head[r, c])
+            ring = self._heat_ring[r, c]
+            samples = ring[:n] if n < HEATMAP_WINDOW else np.concatenate((ring[h:], ring[:h]))
+            out[(r, c)] = samples.tolist()
         return out
 
+    def get_heatmap_version(self) -> int:
+        """Monotonic counter that changes whenever a heatmap cell receives a new sample."""
+        return self._heatmap_version
+
+    def get_heatmap_sums(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per-fine-cell (sum, sum of squares, count) over each cell's sample window.
+
+        Arrays have shape get_heatmap_shape() and are live views; callers must not mutate them.
+        """
+        return self._heat_sum, self._heat_sqsum, self._heat_n
+
+    def _latest_temps(self, rows: np.ndarray, cols: np.ndarray) -> dict[str, float]:
+        """{"row,col": newest sample} for the given fine cells."""
+        latest = self._heat_ring[rows, cols, (self._heat_head[rows, cols] - 1) % HEATMAP_WINDOW]
+        keys = self._heat_keys
+        return {keys[r][c]: v for r, c, v in zip(rows.tolist(), cols.tolist(), latest.tolist())}
+
     def get_heatmap_cells(self) -> dict[str, float]:
-        result = {}
-        for (row, col), temps in self._heatmap_data.items():
-            if not temps:
-                continue
-            result[f"{row},{col}"] = temps[-1]
-        return result
+        """Latest temp per sampled fine cell, keyed "row,col". Shared until the heatmap
+        changes; callers must not mutate it."""
+        if self._heatmap_cells_cache[0] != self._heatmap_version:
+            result = self._latest_temps(*np.nonzero(self._heat_n))
+            self._heatmap_cells_cache = (self._heatmap_version, result)
+        return self._heatmap_cells_cache[1]
+
+    def get_heatmap_cells_since(self, version: int) -> dict[str, float]:
+        """Like get_heatmap_cells(), limited to cells written after heatmap version `version`."""
+        return self._latest_temps(*np.nonzero(self._heat_seq > version))
 
     def get_heatmap_shape(self) -> tuple[int, int]:
         r = self.floorplan.rows * self._heatmap_subdiv
@@ -168,6 +290,10 @@ class SimulationEngine:
     def get_grid(self) -> list[list[int]]:
         return self.floorplan.grid
 
+    def get_grid_np(self) -> np.ndarray:
+        """Floorplan grid as an int16 array (rows, cols); built once, the layout is static."""
+        return self._grid_np
+
     def get_obstacle_points(self, robot_id: str | None = None) -> list[list[float]]:
         rid = robot_id or ROBOT_IDS[0]
         slam = self._slams.get(rid)
@@ -177,7 +303,7 @@ class SimulationEngine:
 
     def get_obstacle_cells(self) -> list[list[int]]:
         """Static floorplan obstacles as [row, col] for 2D/3D visualization."""
-        return [[r, c] for r, c in OBSTACLE_CELLS]
+        return _OBSTACLE_CELL_LIST
 
     def get_simulated_point_cloud(
         self,
@@ -192,33 +318,55 @@ class SimulationEngine:
         r = self._robots.get(rid)
         if not r:
             return []
-        points: list[list[float]] = []
         x0, y0 = r.x, r.y
-        theta0 = r.theta
-        for i in range(num_rays):
-            angle = 2 * math.pi * i / num_rays + random.gauss(0, angle_noise_std)
-            ray_angle = theta0 + angle
-            dist = self.floorplan.raycast(x0, y0, ray_angle, max_range)
-            if dist is None:
-                continue
-            dist_noisy = max(0.05, dist + random.gauss(0, dist_noise_std))
-            wx = x0 + math.cos(ray_angle) * dist_noisy
-            wy = y0 + math.sin(ray_angle) * dist_noisy
-            h = 0.02 + random.gauss(0, height_noise_std)
-            points.append([wx, h, wy])
-        return points
+        # All noise in one draw: rows are angle, distance and height noise per ray
+        noise = _rng.standard_normal((3, num_rays))
+        noise *= np.array([[angle_noise_std], [dist_noise_std], [height_noise_std]])
+        angles = r.theta + _ray_fan(num_rays) + noise[0]
+        dists = self.floorplan.raycast_many(x0, y0, angles, max_range)
+        hit = ~np.isnan(dists)
+        angles, dists = angles[hit], dists[hit]
+        dists = np.maximum(0.05, dists + noise[1, hit])
+        points = np.empty((len(dists), 3))
+        points[:, 0] = x0 + np.cos(angles) * dists
+        points[:, 1] = 0.02 + noise[2, hit]
+        points[:, 2] = y0 + np.sin(angles) * dists
+        return points.tolist()
 
     async def run_loop(self):
         self._running = True
         stuck_advance_interval = 2.0
 
+        # Hot-loop locals: these bindings never change while the engine runs
+        dt = self.dt
+        floorplan = self.floorplan
+        sensors = self.sensors
+        moving_obstacles = self._moving_obstacles
+        # x, y, radius per moving obstacle, refreshed once per tick for the ultrasonic kernel
+        moving_xyr = np.empty((len(moving_obstacles), 3))
+        avoidance_until = self._avoidance_until
+        avoidance_since = self._avoidance_since
+        last_states = self._last_states
+        trails = self._trails
+        trail_counts = self._trail_counts
+        subdiv = self._heatmap_subdiv
+        heat_arrays = (
+            self._heat_ring, self._heat_head, self._heat_sum, self._heat_sqsum,
+            self._heat_n, self._heat_seq, self._fine_traversable,
+        )
+
+        # Fixed-rate schedule on the loop's monotonic clock; immune to wall-clock jumps and
+        # doesn't accumulate per-iteration drift
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
         while self._running:
-            t0 = time.time()
 
-            for obs in self._moving_obstacles:
-                obs.step(self.dt)
+            for obs in moving_obstacles:
+                obs.step(dt)
+            if moving_obstacles:
+                moving_xyr[:] = [(obs.x, obs.y, obs.radius) for obs in moving_obstacles]
 
-            now = time.time()
+            now = time.time()  # one wall-clock read per tick: avoidance timers and state stamps
 
             for rid in ROBOT_IDS:
                 if rid == PHYSICAL_ROBOT_ID:
@@ -226,56 +374,50 @@ class SimulationEngine:
                 robot = self._robots[rid]
                 slam = self._slams[rid]
                 controller = self._controllers[rid]
+                x, y, theta = robot.x, robot.y, robot.theta
 
-                dist = self.sensors.ultrasonic(
-                    robot.x, robot.y, robot.theta,
-                    moving_obstacles=self._moving_obstacles,
-                )
+                dist = sensors.ultrasonic(x, y, theta, moving_obstacles=moving_xyr)
                 dist_m = dist / 100.0
 
-                slam.update_ray(robot.x, robot.y, robot.theta, dist_m)
+                slam.update_ray(x, y, theta, dist_m)
 
                 obstacle_near = slam.is_obstacle_ahead(
-                    robot.x, robot.y, robot.theta,
+                    x, y, theta,
                     distance=0.55, cone_half_rad=0.3,
                 )
 
                 if obstacle_near:
-                    self._avoidance_since[rid] = now if self._avoidance_until[rid] <= now else self._avoidance_since[rid]
-                    self._avoidance_until[rid] = now + 0.7
+                    avoidance_since[rid] = now if avoidance_until[rid] <= now else avoidance_since[rid]
+                    avoidance_until[rid] = now + 0.7
 
-                in_avoidance = now < self._avoidance_until[rid]
+                in_avoidance = now < avoidance_until[rid]
 
                 if in_avoidance:
-                    steer_explore = slam.get_exploration_steer(
-                        robot.x, robot.y, robot.theta, look_dist=0.7
-                    )
-                    steer_clear = slam.get_clear_steer(
-                        robot.x, robot.y, robot.theta, look_dist=0.5
-                    )
+                    steer_explore = slam.get_exploration_steer(x, y, theta, look_dist=0.7)
+                    steer_clear = slam.get_clear_steer(x, y, theta, look_dist=0.5)
                     steer = steer_clear if abs(steer_clear) > 0.5 else steer_explore
                     v_base = 0.28
                     omega = steer * 1.0
                     wheel_base = 0.2
                     v_left = v_base - 0.5 * wheel_base * omega
                     v_right = v_base + 0.5 * wheel_base * omega
-                    if now - self._avoidance_since[rid] >= stuck_advance_interval:
+                    if now - avoidance_since[rid] >= stuck_advance_interval:
                         controller.advance_waypoint()
-                        self._avoidance_until[rid] = 0.0
+                        avoidance_until[rid] = 0.0
                 else:
-                    v_left, v_right = controller.compute(
-                        robot.x, robot.y, robot.theta, self.dt
-                    )
+                    v_left, v_right = controller.compute(x, y, theta, dt)
 
-                robot.step(v_left, v_right, self.dt)
+                robot.step(v_left, v_right, dt)
 
-                row, col = self.floorplan.world_to_cell(robot.x, robot.y)
-                if self.floorplan.is_traversable(row, col):
-                    room_id = self.floorplan.get_room_id_at(robot.x, robot.y)
-                    temp = self.sensors.temperature(robot.x, robot.y, room_id)
-                    hum = self.sensors.humidity(robot.x, robot.y, room_id, temp)
+                x, y = robot.x, robot.y
+                row, col = floorplan.world_to_cell(x, y)
+                traversable = floorplan.is_traversable(row, col)
+                if traversable:
+                    room_id = floorplan.get_room_id_at(x, y)
+                    temp = sensors.temperature(x, y, room_id)
+                    hum = sensors.humidity(x, y, room_id, temp)
                 else:
-                    robot.x -= 0.1
+                    robot.x = x = x - 0.1
                     room_id = None
                     temp = 18.0
                     hum = 50.0
@@ -284,9 +426,9 @@ class SimulationEngine:
 
                 display_room_id = ROBOT_ROOM_ASSIGNMENTS.get(rid, room_id)
                 state = RobotState(
-                    timestamp=time.time(),
-                    x=robot.x,
-                    y=robot.y,
+                    timestamp=now,
+                    x=x,
+                    y=y,
                     theta=robot.theta,
                     ultrasonic_distance_cm=dist,
                     temperature_c=temp,
@@ -294,34 +436,24 @@ class SimulationEngine:
                     room_id=display_room_id,
                 )
 
-                q = self._state_queues[rid]
-                try:
-                    q.put_nowait(state)
-                except asyncio.QueueFull:
-                    try:
-                        q.get_nowait()
-                    except asyncio.QueueEmpty:
-                        pass
-                    q.put_nowait(state)
-                self._last_states[rid] = state
-
-                self._trails[rid].append((robot.x, robot.y))
-                if len(self._trails[rid]) > 500:
-                    self._trails[rid].pop(0)
-
-                if self.floorplan.is_traversable(row, col):
-                    for (fr, fc) in self._fine_cells_under_footprint(robot.x, robot.y):
-                        if not self.floorplan.fine_cell_traversable(fr, fc, self._heatmap_subdiv):
-                            continue
-                        key = (fr, fc)
-                        if key not in self._heatmap_data:
-                            self._heatmap_data[key] = []
-                        self._heatmap_data[key].append(temp)
-                        if len(self._heatmap_data[key]) > 15:
-                            self._heatmap_data[key].pop(0)
-
-            elapsed = time.time() - t0
-            await asyncio.sleep(max(0, self.dt - elapsed))
+                last_states[rid] = state
+
+                trails[rid].append((x, y))  # deque evicts the oldest
+                trail_counts[rid] += 1
+
+                if traversable:
+                    r0, c0 = floorplan.world_to_fine_cell(x, y, subdiv)
+                    self._heatmap_version = _record_footprint(
+                        *heat_arrays, r0, c0, _FOOTPRINT_OFFSETS, temp, self._heatmap_version
+                    )
+
+            self.state_changed.set()
+            next_tick += dt
+            sleep_for = next_tick - loop.time()
+            if sleep_for < -dt:
+                # Overran by more than a step: restart the schedule instead of bursting
+                next_tick = loop.time()
+            await asyncio.sleep(max(0, sleep_for))
 
     def stop(self):
         self._running = False
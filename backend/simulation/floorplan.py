@@ -1,8 +1,14 @@
 """
 2D floorplan: single space (floor 8). Layout from public venue/floor guides.
 """
+import math
 from dataclasses import dataclass
 from enum import IntEnum
+from functools import lru_cache
+
+import numpy as np
+
+from jit import NUMBA_AVAILABLE, njit
 
 
 class CellType(IntEnum):
@@ -63,6 +69,7 @@ OBSTACLE_CELLS = frozenset({
 })
 
 ROOM_ID_TO_NAME: dict[str, str] = {s["id"]: s["name"] for s in SPACES}
+ROOM_BY_ID: dict[str, Room] = {r.id: r for r in ROOM_CONFIGS.values()}
 
 
 def get_room_name(room_id: str | None) -> str:
@@ -72,6 +79,40 @@ def get_room_name(room_id: str | None) -> str:
     return ROOM_ID_TO_NAME.get(room_id, room_id)
 
 
+@lru_cache(maxsize=8)
+def _ray_steps(max_dist: float, step: float = 0.05) -> np.ndarray:
+    """Distances raycast() samples at, accumulated the same way so both agree at max_dist."""
+    out = []
+    d = 0.0
+    while d < max_dist:
+        out.append(d)
+        d += step
+    return np.array(out)
+
+
+@njit(cache=True)
+def _raycast_batch(traversable, ox, oy, thetas, max_dist, cell_size):
+    """raycast() for each theta, with the same accumulated stepping; NaN where nothing is hit."""
+    rows, cols = traversable.shape
+    out = np.full(len(thetas), np.nan)
+    step = 0.05
+    for i in range(len(thetas)):
+        dx = math.cos(thetas[i]) * step
+        dy = math.sin(thetas[i]) * step
+        x, y = ox, oy
+        d = 0.0
+        while d < max_dist:
+            col = int(x / cell_size)
+            row = int(y / cell_size)
+            if not (0 <= row < rows and 0 <= col < cols) or not traversable[row, col]:
+                out[i] = d
+                break
+            x += dx
+            y += dy
+            d += step
+    return out
+
+
 class Floorplan:
     """Manages the 2D grid and space metadata."""
 
@@ -80,6 +121,14 @@ class Floorplan:
         self.rows = len(self.grid)
         self.cols = len(self.grid[0]) if self.grid else 0
         self.cell_size = 1.0
+        self._traversable = np.asarray(self.grid, dtype=np.int16) != 0
+        self._obstacle = np.zeros((self.rows, self.cols), dtype=bool)
+        for r, c in OBSTACLE_CELLS:
+            if 0 <= r < self.rows and 0 <= c < self.cols:
+                self._obstacle[r, c] = True
+        # Room id per cell (None for walls), so room lookups are a plain index
+        room_ids = {ct: room.id for ct, room in ROOM_CONFIGS.items()}
+        self._room_id_by_cell = [[room_ids.get(ct) for ct in row] for row in self.grid]
 
     def get_cell(self, row: int, col: int) -> int:
         if 0 <= row < self.rows and 0 <= col < self.cols:
@@ -87,7 +136,8 @@ class Floorplan:
         return 0
 
     def is_traversable(self, row: int, col: int) -> bool:
-        return self.get_cell(row, col) != 0
+        # Inlined get_cell: this runs for every sensor sample and robot step
+        return 0 <= row < self.rows and 0 <= col < self.cols and self.grid[row][col] != 0
 
     def get_room_at(self, row: int, col: int) -> Room | None:
         ct = self.get_cell(row, col)
@@ -104,12 +154,14 @@ class Floorplan:
         return x, y
 
     def get_room_id_at(self, x: float, y: float) -> str | None:
-        row, col = self.world_to_cell(x, y)
-        room = self.get_room_at(row, col)
-        return room.id if room else None
+        row = int(y / self.cell_size)
+        col = int(x / self.cell_size)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return self._room_id_by_cell[row][col]
+        return None
 
     def is_obstacle(self, row: int, col: int) -> bool:
-        return (row, col) in OBSTACLE_CELLS
+        return 0 <= row < self.rows and 0 <= col < self.cols and bool(self._obstacle[row, col])
 
     def world_to_fine_cell(self, x: float, y: float, subdiv: int = 2) -> tuple[int, int]:
         col = int(x * subdiv / self.cell_size)
@@ -124,7 +176,6 @@ class Floorplan:
     def raycast(self, ox: float, oy: float, theta: float, max_dist: float = 20.0) -> float | None:
         """Cast a ray from (ox, oy) in direction theta (radians). Returns distance to first
         non-traversable cell, or None if no hit within max_dist. Uses DDA-style stepping."""
-        import math
         step = 0.05
         dx = math.cos(theta) * step
         dy = math.sin(theta) * step
@@ -138,3 +189,27 @@ class Floorplan:
             y += dy
             d += step
         return None
+
+    def raycast_many(
+        self, ox: float, oy: float, thetas: np.ndarray, max_dist: float = 20.0
+    ) -> np.ndarray:
+        """raycast() for many directions at once. Returns distances, NaN where nothing is hit
+        within max_dist. Same 0.05 step and cell lookup; compiled per-ray walks with early
+        exit when numba is available, otherwise one array pass over every step."""
+        thetas = np.asarray(thetas, dtype=np.float64)
+        if NUMBA_AVAILABLE:
+            return _raycast_batch(
+                self._traversable, float(ox), float(oy), thetas, float(max_dist), self.cell_size
+            )
+        d = _ray_steps(max_dist)
+        xs = ox + np.cos(thetas)[:, None] * d
+        ys = oy + np.sin(thetas)[:, None] * d
+        # int() truncation toward zero, as world_to_cell does
+        cols = np.trunc(xs / self.cell_size).astype(np.intp)
+        rows = np.trunc(ys / self.cell_size).astype(np.intp)
+        inside = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        blocked = ~inside
+        blocked[inside] = ~self._traversable[rows[inside], cols[inside]]
+        hit = blocked.any(axis=1)
+        first = blocked.argmax(axis=1)
+        return np.where(hit, d[first], np.nan)
@@ -2,7 +2,6 @@
 Moving obstacles: positions updated each frame so SLAM can detect and avoid them.
 """
 import math
-import time
 
 
 class MovingObstacle:
@@ -13,15 +12,15 @@ class MovingObstacle:
         self.y = y
         self.radius = radius
         self.speed = speed
-        self._t0 = time.time()
+        self._phase = 0.0  # angle along the circular path, advanced by sim time
         self._path_center_x = x
         self._path_center_y = y
         self._path_radius = 2.5  # circular path radius
 
     def step(self, dt: float) -> None:
-        t = time.time() - self._t0
-        self.x = self._path_center_x + self._path_radius * math.cos(t * self.speed)
-        self.y = self._path_center_y + self._path_radius * math.sin(t * self.speed)
+        self._phase += dt * self.speed
+        self.x = self._path_center_x + self._path_radius * math.cos(self._phase)
+        self.y = self._path_center_y + self._path_radius * math.sin(self._phase)
 
 
 def make_default_moving_obstacles(bounds_center_x: float, bounds_center_y: float) -> list:
@@ -17,12 +17,16 @@ class Robot:
         v = (v_left + v_right) / 2
         omega = (v_right - v_left) / self.wheel_base
 
-        self.x += v * math.cos(self.theta) * dt
-        self.y += v * math.sin(self.theta) * dt
-        self.theta += omega * dt
+        theta = self.theta
+        if v:
+            self.x += v * math.cos(theta) * dt
+            self.y += v * math.sin(theta) * dt
+        theta += omega * dt
 
-        # Normalize theta to [-pi, pi]
-        self.theta = math.atan2(math.sin(self.theta), math.cos(self.theta))
+        # Normalize theta to [-pi, pi]; only needed once a turn carries it past +-pi
+        if not -math.pi <= theta <= math.pi:
+            theta = (theta + math.pi) % math.tau - math.pi
+        self.theta = theta
 
     def to_dict(self):
         return {"x": self.x, "y": self.y, "theta": self.theta}
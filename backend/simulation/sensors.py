@@ -5,7 +5,136 @@ UK campus building environment with obstacles.
 import math
 import random
 import time
-from .floorplan import Floorplan, ROOM_CONFIGS, CellType
+
+import numpy as np
+
+from jit import NUMBA_AVAILABLE, njit
+
+from .floorplan import Floorplan, ROOM_BY_ID, CellType
+
+# Temperature sensor field of view: (dx, dy, weight) around the robot
+_FOV_OFFSETS = (
+    (0, 0, 1.0),
+    (-0.5, 0, 0.6), (0.5, 0, 0.6), (0, -0.5, 0.6), (0, 0.5, 0.6),
+    (-0.5, -0.5, 0.4), (-0.5, 0.5, 0.4), (0.5, -0.5, 0.4), (0.5, 0.5, 0.4),
+    (-1, 0, 0.25), (1, 0, 0.25), (0, -1, 0.25), (0, 1, 0.25),
+)
+_FOV = np.array(_FOV_OFFSETS)
+
+
+@njit(cache=True)
+def _seed_numba_rng(seed: int) -> None:
+    """Seed numba's RNG stream, which np.random.seed in the interpreter does not reach."""
+    np.random.seed(seed)
+
+
+@njit(cache=True)
+def _subcell_variation(x: float, y: float) -> float:
+    """Smooth spatial variation along hallway: cold spots near walls, slight run of pipe."""
+    return (
+        0.35 * math.sin(x * 0.8) * math.cos(y * 0.6)
+        + 0.25 * math.sin(x * 1.8 + 0.5) * math.cos(y * 1.2)
+        + 0.2 * (math.sin((x + y) * 1.2) + 0.2)
+    )
+
+
+@njit(cache=True)
+def _fov_temperature(
+    traversable, temp_lo, temp_hi, radiator, fov, x, y, cell_size, drift, warm_spell, noise_std,
+):
+    """temperature()'s FOV samples in one compiled pass; returns (weighted sum, total weight).
+    Same per-sample model as SensorSimulator._temperature_at, on numba's RNG stream."""
+    rows, cols = traversable.shape
+    total = 0.0
+    weight = 0.0
+    for i in range(fov.shape[0]):
+        px = x + fov[i, 0]
+        py = y + fov[i, 1]
+        r = int(py / cell_size)
+        c = int(px / cell_size)
+        if not (0 <= r < rows and 0 <= c < cols) or not traversable[r, c]:
+            continue
+        v = np.random.uniform(temp_lo[r, c], temp_hi[r, c])
+        if radiator[r, c]:
+            v += 0.5 * (1.0 - r / max(1, rows)) + 0.2 * math.sin(c * 0.2)
+        v += _subcell_variation(px, py)
+        v += drift
+        if radiator[r, c] and warm_spell:
+            v += np.random.uniform(0.3, 1.2)
+        v += np.random.normal(0.0, noise_std)
+        total += v * fov[i, 2]
+        weight += fov[i, 2]
+    return total, weight
+
+
+@njit(cache=True)
+def _nearest_circle_hit(ox, oy, theta, xyr, limit):
+    """Nearest positive distance along ray (ox, oy, theta) to any circle in the (N, 3) x, y,
+    radius rows, if closer than limit; otherwise limit."""
+    dx = math.cos(theta)
+    dy = math.sin(theta)
+    a = dx * dx + dy * dy
+    best = limit
+    for i in range(xyr.shape[0]):
+        cx = ox - xyr[i, 0]
+        cy = oy - xyr[i, 1]
+        b = 2 * (cx * dx + cy * dy)
+        c = cx * cx + cy * cy - xyr[i, 2] * xyr[i, 2]
+        disc = b * b - 4 * a * c
+        if disc < 0:
+            continue
+        sqrt_d = math.sqrt(disc)
+        t1 = (-b - sqrt_d) / (2 * a)
+        t2 = (-b + sqrt_d) / (2 * a)
+        # Nearest non-negative root
+        t = t1 if t1 >= 0 else t2
+        if 0 < t < best:
+            best = t
+    return best
+
+
+# _grid_raycast hit kinds
+_HIT_NONE, _HIT_WALL, _HIT_OBSTACLE = 0, 1, 2
+
+
+@njit(cache=True)
+def _grid_raycast(traversable, obstacle, x, y, theta, max_dist, cell_size):
+    """Amanatides-Woo walk from (x, y) along theta, one step per cell boundary crossed.
+    Returns (distance to the first blocked cell, hit kind); off-grid counts as wall."""
+    rows, cols = traversable.shape
+    dx = math.cos(theta)
+    dy = math.sin(theta)
+    col = int(math.floor(x / cell_size))
+    row = int(math.floor(y / cell_size))
+    step_c = 1 if dx > 0 else -1
+    step_r = 1 if dy > 0 else -1
+    if dx != 0.0:
+        t_delta_c = cell_size / abs(dx)
+        t_max_c = ((col + (1 if dx > 0 else 0)) * cell_size - x) / dx
+    else:
+        t_delta_c = t_max_c = math.inf
+    if dy != 0.0:
+        t_delta_r = cell_size / abs(dy)
+        t_max_r = ((row + (1 if dy > 0 else 0)) * cell_size - y) / dy
+    else:
+        t_delta_r = t_max_r = math.inf
+    t = 0.0
+    while t <= max_dist:
+        if not (0 <= row < rows and 0 <= col < cols):
+            return t, _HIT_WALL
+        if obstacle[row, col]:
+            return t, _HIT_OBSTACLE
+        if not traversable[row, col]:
+            return t, _HIT_WALL
+        if t_max_c < t_max_r:
+            t = t_max_c
+            t_max_c += t_delta_c
+            col += step_c
+        else:
+            t = t_max_r
+            t_max_r += t_delta_r
+            row += step_r
+    return max_dist, _HIT_NONE
 
 
 class SensorSimulator:
@@ -17,71 +146,56 @@ class SensorSimulator:
         self._temp_noise = 0.15
         self._humidity_noise = 2.5
         self._t0 = time.time()
+        if NUMBA_AVAILABLE:
+            # Draw from random so a seeded simulation stays reproducible on the compiled path
+            _seed_numba_rng(random.getrandbits(32))
+        # Per-cell inputs for the compiled FOV pass: uniform base range and whether the
+        # radiator gradient applies (rooms only; other cells use the corridor range)
+        shape = (floorplan.rows, floorplan.cols)
+        self._cell_temp_lo = np.full(shape, 17.2)
+        self._cell_temp_hi = np.full(shape, 18.8)
+        self._cell_radiator = np.zeros(shape, dtype=bool)
+        for r, row in enumerate(floorplan._room_id_by_cell):
+            for c, rid in enumerate(row):
+                room = ROOM_BY_ID.get(rid) if rid else None
+                if room:
+                    self._cell_temp_lo[r, c], self._cell_temp_hi[r, c] = room.temp_range
+                    self._cell_radiator[r, c] = rid == "floor_8"
 
     def _raycast_ultrasonic(self, x: float, y: float, theta: float) -> float:
         """Raycast to nearest static obstacle or wall."""
-        dx = math.cos(theta)
-        dy = math.sin(theta)
-        step = 0.05
-        dist = 0.0
-        max_dist = self.ultrasonic_max_cm / 100
-
-        while dist < max_dist:
-            dist += step
-            px = x + dx * dist
-            py = y + dy * dist
-            row, col = self.floorplan.world_to_cell(px, py)
-            if self.floorplan.is_obstacle(row, col):
-                dist_cm = dist * 100
-                noise = random.gauss(0, 1.5)
-                return max(8.0, min(self.ultrasonic_max_cm, dist_cm + noise))
-            if not self.floorplan.is_traversable(row, col):
-                dist_cm = dist * 100
-                noise = random.gauss(0, 1.0)
-                return max(2.0, min(self.ultrasonic_max_cm, dist_cm + noise))
+        fp = self.floorplan
+        dist, hit = _grid_raycast(
+            fp._traversable, fp._obstacle, x, y, theta,
+            self.ultrasonic_max_cm / 100, fp.cell_size,
+        )
+        if hit == _HIT_OBSTACLE:
+            noise = random.gauss(0, 1.5)
+            return max(8.0, min(self.ultrasonic_max_cm, dist * 100 + noise))
+        if hit == _HIT_WALL:
+            noise = random.gauss(0, 1.0)
+            return max(2.0, min(self.ultrasonic_max_cm, dist * 100 + noise))
         return self.ultrasonic_max_cm
 
-    def _distance_to_moving_obstacle(
-        self, ox: float, oy: float, theta: float, mx: float, my: float, radius: float
-    ) -> float | None:
-        """Distance along ray (ox,oy,theta) to circle (mx,my,radius), or None if no hit."""
-        dx = math.cos(theta)
-        dy = math.sin(theta)
-        cx = ox - mx
-        cy = oy - my
-        a = dx * dx + dy * dy
-        b = 2 * (cx * dx + cy * dy)
-        c = cx * cx + cy * cy - radius * radius
-        disc = b * b - 4 * a * c
-        if disc < 0:
-            return None
-        sqrt_d = math.sqrt(disc)
-        t1 = (-b - sqrt_d) / (2 * a)
-        t2 = (-b + sqrt_d) / (2 * a)
-        t = None
-        if t1 >= 0:
-            t = t1
-        if t2 >= 0 and (t is None or t2 < t):
-            t = t2
-        return t if t is not None and t >= 0 else None
-
     def ultrasonic(
         self,
         x: float,
         y: float,
         theta: float,
-        moving_obstacles: list | None = None,
+        moving_obstacles: list | np.ndarray | None = None,
     ) -> float:
-        """Min of static raycast and distances to any moving obstacles along the ray."""
-        static_dist_m = self._raycast_ultrasonic(x, y, theta) / 100.0
-        min_dist_m = static_dist_m
-        if moving_obstacles:
-            for obs in moving_obstacles:
-                d = self._distance_to_moving_obstacle(
-                    x, y, theta, obs.x, obs.y, getattr(obs, "radius", 0.35)
+        """Min of static raycast and distances to any moving obstacles along the ray.
+
+        moving_obstacles is either obstacle objects (x, y, optional radius) or an (N, 3)
+        array of x, y, radius rows; the engine passes the array it refreshes each tick.
+        """
+        min_dist_m = self._raycast_ultrasonic(x, y, theta) / 100.0
+        if moving_obstacles is not None and len(moving_obstacles):
+            if not isinstance(moving_obstacles, np.ndarray):
+                moving_obstacles = np.array(
+                    [(o.x, o.y, getattr(o, "radius", 0.35)) for o in moving_obstacles]
                 )
-                if d is not None and 0 < d < min_dist_m:
-                    min_dist_m = d
+            min_dist_m = _nearest_circle_hit(x, y, theta, moving_obstacles, min_dist_m)
         return min_dist_m * 100.0
 
     def _radiator_gradient(self, x: float, y: float, room_id: str | None) -> float:
@@ -92,14 +206,6 @@ class SensorSimulator:
         rows = self.floorplan.rows
         return 0.5 * (1.0 - row / max(1, rows)) + 0.2 * math.sin(col * 0.2)
 
-    def _subcell_variation(self, x: float, y: float) -> float:
-        """Smooth spatial variation along hallway: cold spots near walls, slight run of pipe."""
-        return (
-            0.35 * math.sin(x * 0.8) * math.cos(y * 0.6)
-            + 0.25 * math.sin(x * 1.8 + 0.5) * math.cos(y * 1.2)
-            + 0.2 * (math.sin((x + y) * 1.2) + 0.2)
-        )
-
     def _time_drift(self) -> float:
         """Very slow drift so heatmap feels slightly dynamic."""
         t = time.time() - self._t0
@@ -107,12 +213,11 @@ class SensorSimulator:
 
     def _temperature_at(self, x: float, y: float, room_id: str | None) -> float:
         """Single-point temperature (internal)."""
-        if room_id and room_id in [r.id for r in ROOM_CONFIGS.values()]:
-            room = next(r for r in ROOM_CONFIGS.values() if r.id == room_id)
-            lo, hi = room.temp_range
-            base = random.uniform(lo, hi)
+        room = ROOM_BY_ID.get(room_id) if room_id else None
+        if room:
+            base = random.uniform(*room.temp_range)
             base += self._radiator_gradient(x, y, room_id)
-            base += self._subcell_variation(x, y)
+            base += _subcell_variation(x, y)
             base += self._time_drift()
             if room_id == "floor_8":
                 t = time.time() - self._t0
@@ -120,38 +225,40 @@ class SensorSimulator:
                     base += random.uniform(0.3, 1.2)
         else:
             base = random.uniform(17.2, 18.8)
-            base += self._subcell_variation(x, y)
+            base += _subcell_variation(x, y)
             base += self._time_drift()
         return base + random.gauss(0, self._temp_noise)
 
     def temperature(self, x: float, y: float, room_id: str | None) -> float:
         """Realistic sensor: weighted average over current + adjacent 1m + next ring (simulates FOV)."""
-        offsets = [
-            (0, 0, 1.0),
-            (-0.5, 0, 0.6), (0.5, 0, 0.6), (0, -0.5, 0.6), (0, 0.5, 0.6),
-            (-0.5, -0.5, 0.4), (-0.5, 0.5, 0.4), (0.5, -0.5, 0.4), (0.5, 0.5, 0.4),
-            (-1, 0, 0.25), (1, 0, 0.25), (0, -1, 0.25), (0, 1, 0.25),
-        ]
-        total = 0.0
-        weight = 0.0
-        for dx, dy, w in offsets:
-            px, py = x + dx, y + dy
-            row, col = self.floorplan.world_to_cell(px, py)
-            if not self.floorplan.is_traversable(row, col):
-                continue
-            rid = self.floorplan.get_room_id_at(px, py)
-            total += self._temperature_at(px, py, rid) * w
-            weight += w
+        fp = self.floorplan
+        if NUMBA_AVAILABLE:
+            t = time.time() - self._t0
+            total, weight = _fov_temperature(
+                fp._traversable, self._cell_temp_lo, self._cell_temp_hi, self._cell_radiator,
+                _FOV, x, y, fp.cell_size, self._time_drift(), 20 < (t % 200) < 70,
+                self._temp_noise,
+            )
+        else:
+            total = 0.0
+            weight = 0.0
+            for dx, dy, w in _FOV_OFFSETS:
+                px, py = x + dx, y + dy
+                row, col = fp.world_to_cell(px, py)
+                if not fp.is_traversable(row, col):
+                    continue
+                rid = fp.get_room_id_at(px, py)
+                total += self._temperature_at(px, py, rid) * w
+                weight += w
         if weight < 1e-6:
             return self._temperature_at(x, y, room_id)
         return total / weight
 
     def humidity(self, x: float, y: float, room_id: str | None, temp: float) -> float:
         """UK indoor: 40–60% typical; higher when overheated and stuffy."""
-        if room_id and room_id in [r.id for r in ROOM_CONFIGS.values()]:
-            room = next(r for r in ROOM_CONFIGS.values() if r.id == room_id)
-            lo, hi = room.humidity_range
-            base = random.uniform(lo, hi)
+        room = ROOM_BY_ID.get(room_id) if room_id else None
+        if room:
+            base = random.uniform(*room.humidity_range)
         else:
             base = random.uniform(48.0, 55.0)
         if temp > 22:
@@ -4,8 +4,128 @@ optimized ray checks for smooth loop performance.
 """
 import math
 
+import numpy as np
+
+from jit import njit
+
 FREE, OCCUPIED, UNKNOWN = 0.0, 1.0, 0.5
 
+# Cells are stored as uint8 codes (value * 255, UNKNOWN as 128); _CELL_VALUE maps back
+_CELL_FREE, _CELL_OCCUPIED, _CELL_UNKNOWN = 0, 255, 128
+_CELL_OCCUPIED_MIN = 230  # code for "occupied" (value >= 0.9)
+_CELL_VALUE = np.arange(256) / 255.0
+_CELL_VALUE[_CELL_UNKNOWN] = UNKNOWN
+
+
+@njit(cache=True)
+def _trace_ray(grid, r0: int, c0: int, r1: int, c1: int) -> int:
+    """Bresenham from (r0, c0) to (r1, c1): cells before the end become FREE, the end
+    cell OCCUPIED. Off-grid cells are skipped. Returns how many cells changed value."""
+    rows, cols = grid.shape
+    changed = 0
+    dr = abs(r1 - r0)
+    dc = abs(c1 - c0)
+    sr = 1 if r0 < r1 else -1
+    sc = 1 if c0 < c1 else -1
+    err = dr - dc
+    r, c = r0, c0
+    for _ in range(dr + dc + 1):
+        last = r == r1 and c == c1
+        if 0 <= r < rows and 0 <= c < cols:
+            value = _CELL_OCCUPIED if last else _CELL_FREE
+            if grid[r, c] != value:
+                grid[r, c] = value
+                changed += 1
+        if last:
+            break
+        e2 = 2 * err
+        if e2 > -dc:
+            err -= dc
+            r += sr
+        if e2 < dr:
+            err += dr
+            c += sc
+    return changed
+
+
+@njit(cache=True)
+def _ray_walk_occupied(grid, wx, wy, theta, max_dist_m, step_m, subdiv, cell_size) -> bool:
+    rows, cols = grid.shape
+    step_x = math.cos(theta) * step_m
+    step_y = math.sin(theta) * step_m
+    x, y = wx, wy
+    dist = 0.0
+    while dist < max_dist_m:
+        gr = int(y * subdiv / cell_size)
+        gc = int(x * subdiv / cell_size)
+        if not (0 <= gr < rows and 0 <= gc < cols) or grid[gr, gc] >= _CELL_OCCUPIED_MIN:
+            return True
+        x += step_x
+        y += step_y
+        dist += step_m
+    return False
+
+
+@njit(cache=True)
+def _ray_count_unknown(grid, wx, wy, theta, max_dist_m, step_m, subdiv, cell_size) -> int:
+    rows, cols = grid.shape
+    step_x = math.cos(theta) * step_m
+    step_y = math.sin(theta) * step_m
+    x, y = wx, wy
+    dist = 0.0
+    count = 0
+    while dist < max_dist_m:
+        gr = int(y * subdiv / cell_size)
+        gc = int(x * subdiv / cell_size)
+        if not (0 <= gr < rows and 0 <= gc < cols):
+            break
+        v = grid[gr, gc]
+        if v == _CELL_UNKNOWN:
+            count += 1
+        elif v >= _CELL_OCCUPIED_MIN:
+            break
+        x += step_x
+        y += step_y
+        dist += step_m
+    return count
+
+
+@njit(cache=True)
+def _rays_occupied_mask(
+    grid, wx, wy, theta, rels, scale, max_dist_m, step_m, subdiv, cell_size, first_only,
+):
+    """_ray_walk_occupied for each ray theta + rels[i] * scale from one origin, in one call.
+    Bit i of the result is set when ray i hits; first_only stops at the first hit."""
+    mask = 0
+    for i in range(len(rels)):
+        t = theta + rels[i] * scale
+        if _ray_walk_occupied(grid, wx, wy, t, max_dist_m, step_m, subdiv, cell_size):
+            mask |= 1 << i
+            if first_only:
+                break
+    return mask
+
+
+@njit(cache=True)
+def _most_unknown_ray(grid, wx, wy, theta, rels, max_dist_m, step_m, subdiv, cell_size):
+    """Index of the ray theta + rels[i] seeing the most unknown cells (first on ties)."""
+    best = 0
+    best_count = -1
+    for i in range(len(rels)):
+        n = _ray_count_unknown(grid, wx, wy, theta + rels[i], max_dist_m, step_m, subdiv, cell_size)
+        if n > best_count:
+            best_count = n
+            best = i
+    return best
+
+
+# Ray fans relative to heading: obstacle cone (scaled by cone_half_rad), clear-steer
+# left/right, and the exploration sweep with the steer each direction maps to
+_CONE = np.array([-1.0, 0.0, 1.0])
+_CLEAR_RELS = np.array([0.45, -0.45])
+_EXPLORE_RELS = np.array([-0.7, -0.35, 0.0, 0.35, 0.7])
+_EXPLORE_STEERS = (-0.6, -0.6, 0.0, 0.6, 0.6)
+
 
 class OccupancyGrid:
     """
@@ -19,9 +139,14 @@ class OccupancyGrid:
         self.cell_size = cell_size
         self.subdiv = subdiv
         self.resolution = cell_size / subdiv
-        self._grid = [[UNKNOWN] * self.cols for _ in range(self.rows)]
+        self._grid = np.full((self.rows, self.cols), _CELL_UNKNOWN, dtype=np.uint8)
         self._bounds_rows = rows
         self._bounds_cols = cols
+        # Bumped whenever a cell value changes; read-only snapshots are shared until it moves
+        self._version = 0
+        self._grid_snapshot: tuple[int, np.ndarray] | None = None
+        self._obstacle_snapshot: tuple[int, list[list[float]]] | None = None
+        self._viz_snapshot: tuple[int, dict[str, float]] | None = None
 
     def _world_to_grid(self, x: float, y: float) -> tuple[int, int]:
         gcol = int(x * self.subdiv / self.cell_size)
@@ -32,12 +157,14 @@ class OccupancyGrid:
         return 0 <= gr < self.rows and 0 <= gc < self.cols
 
     def _set(self, gr: int, gc: int, value: float) -> None:
-        if self._in_bounds(gr, gc):
-            self._grid[gr][gc] = value
+        code = int(round(value * 255))
+        if 0 <= gr < self.rows and 0 <= gc < self.cols and self._grid[gr, gc] != code:
+            self._grid[gr, gc] = code
+            self._version += 1
 
     def _get(self, gr: int, gc: int) -> float:
-        if self._in_bounds(gr, gc):
-            return self._grid[gr][gc]
+        if 0 <= gr < self.rows and 0 <= gc < self.cols:
+            return float(_CELL_VALUE[self._grid[gr, gc]])
         return OCCUPIED
 
     def update_ray(self, ox: float, oy: float, theta: float, range_m: float) -> None:
@@ -45,83 +172,39 @@ class OccupancyGrid:
         end_x = ox + math.cos(theta) * range_m
         end_y = oy + math.sin(theta) * range_m
         grow1, gcol1 = self._world_to_grid(end_x, end_y)
-        cells = self._bresenham(grow0, gcol0, grow1, gcol1)
-        for i, (gr, gc) in enumerate(cells):
-            if not self._in_bounds(gr, gc):
-                continue
-            if i < len(cells) - 1:
-                self._set(gr, gc, FREE)
-            else:
-                self._set(gr, gc, OCCUPIED)
-
-    def _bresenham(self, r0: int, c0: int, r1: int, c1: int) -> list[tuple[int, int]]:
-        out = []
-        dr = abs(r1 - r0)
-        dc = abs(c1 - c0)
-        sr = 1 if r0 < r1 else -1
-        sc = 1 if c0 < c1 else -1
-        err = dr - dc
-        r, c = r0, c0
-        for _ in range(dr + dc + 1):
-            out.append((r, c))
-            if r == r1 and c == c1:
-                break
-            e2 = 2 * err
-            if e2 > -dc:
-                err -= dc
-                r += sr
-            if e2 < dr:
-                err += dr
-                c += sc
-        return out
+        self._version += _trace_ray(self._grid, grow0, gcol0, grow1, gcol1)
 
     def _ray_walk_occupied(self, wx: float, wy: float, theta: float, max_dist_m: float) -> bool:
         """Early-exit: True if any occupied cell along ray within max_dist_m."""
-        step_m = self.resolution * 0.8
-        x, y = wx, wy
-        dist = 0.0
-        while dist < max_dist_m:
-            gr, gc = self._world_to_grid(x, y)
-            if self._get(gr, gc) >= 0.9:
-                return True
-            x += math.cos(theta) * step_m
-            y += math.sin(theta) * step_m
-            dist += step_m
-        return False
+        return _ray_walk_occupied(
+            self._grid, wx, wy, theta, max_dist_m,
+            self.resolution * 0.8, self.subdiv, self.cell_size,
+        )
 
     def _ray_count_unknown(self, wx: float, wy: float, theta: float, max_dist_m: float) -> int:
         """Count unknown cells along ray (for exploration)."""
-        step_m = self.resolution * 1.2
-        x, y = wx, wy
-        dist = 0.0
-        count = 0
-        while dist < max_dist_m:
-            gr, gc = self._world_to_grid(x, y)
-            if not self._in_bounds(gr, gc):
-                break
-            if self._grid[gr][gc] == UNKNOWN:
-                count += 1
-            elif self._grid[gr][gc] >= 0.9:
-                break
-            x += math.cos(theta) * step_m
-            y += math.sin(theta) * step_m
-            dist += step_m
-        return count
+        return _ray_count_unknown(
+            self._grid, wx, wy, theta, max_dist_m,
+            self.resolution * 1.2, self.subdiv, self.cell_size,
+        )
 
     def is_obstacle_ahead(
         self, wx: float, wy: float, theta: float, distance: float, cone_half_rad: float = 0.3
     ) -> bool:
         """True if occupied cell within distance in a narrow cone. Uses 3 rays, early-exit."""
-        for i in (-1, 0, 1):
-            t = theta + i * cone_half_rad
-            if self._ray_walk_occupied(wx, wy, t, distance):
-                return True
-        return False
+        return _rays_occupied_mask(
+            self._grid, wx, wy, theta, _CONE, cone_half_rad, distance,
+            self.resolution * 0.8, self.subdiv, self.cell_size, True,
+        ) != 0
 
     def get_clear_steer(self, wx: float, wy: float, theta: float, look_dist: float = 0.55) -> float:
         """Prefer left or right that is clear. Two rays only."""
-        left_clear = not self._ray_walk_occupied(wx, wy, theta + 0.45, look_dist)
-        right_clear = not self._ray_walk_occupied(wx, wy, theta - 0.45, look_dist)
+        hits = _rays_occupied_mask(
+            self._grid, wx, wy, theta, _CLEAR_RELS, 1.0, look_dist,
+            self.resolution * 0.8, self.subdiv, self.cell_size, False,
+        )
+        left_clear = not hits & 1
+        right_clear = not hits & 2
         if left_clear and not right_clear:
             return 0.75
         if right_clear and not left_clear:
@@ -137,28 +220,36 @@ class OccupancyGrid:
         Prefer turning toward direction with most unknown cells (explore while SLAM).
         Returns steer: positive = right, negative = left.
         """
-        best_steer = 0.0
-        best_count = -1
-        for i, rel in enumerate([-0.7, -0.35, 0.0, 0.35, 0.7]):
-            t = theta + rel
-            n = self._ray_count_unknown(wx, wy, t, look_dist)
-            if n > best_count:
-                best_count = n
-                best_steer = 0.6 if rel > 0 else (-0.6 if rel < 0 else 0.0)
-        return best_steer
+        best = _most_unknown_ray(
+            self._grid, wx, wy, theta, _EXPLORE_RELS, look_dist,
+            self.resolution * 1.2, self.subdiv, self.cell_size,
+        )
+        return _EXPLORE_STEERS[best]
 
     def get_occupancy_for_viz(self) -> dict[str, float]:
-        out = {}
-        for r in range(self.rows):
-            for c in range(self.cols):
-                v = self._grid[r][c]
-                if v != UNKNOWN:
-                    out[f"{r},{c}"] = v
-        return out
-
-    def get_occupancy_grid(self) -> list[list[float]]:
-        """Return 2D grid for frontend overlay. Row-major."""
-        return [row[:] for row in self._grid]
+        """Known cells as {"r,c": value}.
+
+        The dict is shared by all callers until the grid next changes; do not mutate it.
+        """
+        snap = self._viz_snapshot
+        if snap is None or snap[0] != self._version:
+            rs, cs = np.nonzero(self._grid != _CELL_UNKNOWN)
+            vals = _CELL_VALUE[self._grid[rs, cs]].tolist()
+            viz = {f"{r},{c}": v for r, c, v in zip(rs.tolist(), cs.tolist(), vals)}
+            snap = self._viz_snapshot = (self._version, viz)
+        return snap[1]
+
+    def get_occupancy_grid(self) -> np.ndarray:
+        """Return 2D grid for frontend overlay. Row-major.
+
+        Read-only array shared by all callers until the grid next changes.
+        """
+        snap = self._grid_snapshot
+        if snap is None or snap[0] != self._version:
+            grid = _CELL_VALUE[self._grid]
+            grid.flags.writeable = False
+            snap = self._grid_snapshot = (self._version, grid)
+        return snap[1]
 
     def get_occupancy_bounds(self) -> tuple[float, float, float, float]:
         """Return (x_min, x_max, z_min, z_max) in world coords for overlay."""
@@ -166,13 +257,18 @@ class OccupancyGrid:
         return (0, self.cols * res, 0, self.rows * res)
 
     def get_obstacle_points(self) -> list[list[float]]:
-        """Return list of [x, y, z] for occupied cells (obstacle point cloud)."""
+        """Return list of [x, y, z] for occupied cells (obstacle point cloud).
+
+        The list is shared by all callers until the grid next changes; do not mutate it.
+        """
+        snap = self._obstacle_snapshot
+        if snap is None or snap[0] != self._version:
+            snap = self._obstacle_snapshot = (self._version, self._build_obstacle_points())
+        return snap[1]
+
+    def _build_obstacle_points(self) -> list[list[float]]:
         res = self.resolution
-        points = []
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self._grid[r][c] >= 0.9:  # occupied
-                    x = (c + 0.5) * res
-                    z = (r + 0.5) * res
-                    points.append([x, 0.15, z])
-        return points
+        return [
+            [(c + 0.5) * res, 0.15, (r + 0.5) * res]
+            for r, c in np.argwhere(self._grid >= _CELL_OCCUPIED_MIN).tolist()  # occupied
+        ]
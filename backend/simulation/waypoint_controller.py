@@ -40,6 +40,7 @@ class WaypointController:
     ):
         self.waypoints = waypoints or PATROL_WAYPOINTS
         self.arrival_dist = arrival_dist
+        self._arrival_dist_sq = arrival_dist * arrival_dist
         self.v_base = v_base
         self.k_steer = k_steer
         self.wheel_base = 0.2
@@ -53,21 +54,24 @@ class WaypointController:
         wx, wy = self.waypoints[self._idx]
         dx = wx - x
         dy = wy - y
-        dist = (dx * dx + dy * dy) ** 0.5
+        # Compare squared distances; no sqrt needed on any path
+        dist_sq = dx * dx + dy * dy
 
-        if dist < self.arrival_dist:
+        if dist_sq < self._arrival_dist_sq:
             self._idx = (self._idx + 1) % len(self.waypoints)
             wx, wy = self.waypoints[self._idx]
             dx = wx - x
             dy = wy - y
-            dist = (dx * dx + dy * dy) ** 0.5
+            dist_sq = dx * dx + dy * dy
 
-        if dist < 0.01:
+        if dist_sq < 0.0001:
             return self.v_base * 0.5, self.v_base * 0.5
 
         target_theta = math.atan2(dy, dx)
         error = target_theta - theta
-        error = math.atan2(math.sin(error), math.cos(error))
+        # Wrap to [-pi, pi] arithmetically; only needed when the headings straddle +-pi
+        if not -math.pi <= error <= math.pi:
+            error = (error + math.pi) % math.tau - math.pi
         omega = self.k_steer * error
         omega = max(-1.2, min(1.2, omega))
 
@@ -11,6 +11,8 @@ Metrics:
 
 from dataclasses import dataclass
 
+import numpy as np
+
 SETPOINT_C = 19.0
 OVERHEAT_THRESHOLD_C = 22.0
 ROOM_VOLUME_M3 = 100.0  # Assumed room volume for wasted power estimate
@@ -28,6 +30,70 @@ class ThermalReading:
     room_id: int
 
 
+class ThermalHistory:
+    """
+    Most recent thermal readings (up to capacity) stored column-wise as NumPy arrays.
+    Appends are O(1); the column properties are oldest-first views, valid until the
+    next append. `version` counts appends, so callers can cache derived results.
+    """
+
+    def __init__(self, capacity: int = 500):
+        self.capacity = capacity
+        # Twice the capacity so the live window stays contiguous; when the end is reached
+        # the newest `capacity` rows are moved back to the front (amortised O(1)).
+        self._x = np.empty(2 * capacity)
+        self._y = np.empty(2 * capacity)
+        self._surface = np.empty(2 * capacity)
+        self._air = np.empty(2 * capacity)
+        self._room = np.empty(2 * capacity, dtype=np.int64)
+        self._start = 0
+        self._end = 0
+        self.version = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def append(
+        self, x_m: float, y_m: float, surface_temp_c: float, air_temp_c: float, room_id: int
+    ) -> None:
+        if self._end == 2 * self.capacity:
+            keep = slice(self._end - self.capacity + 1, self._end)
+            n = self.capacity - 1
+            for col in (self._x, self._y, self._surface, self._air, self._room):
+                col[:n] = col[keep]
+            self._start, self._end = 0, n
+        i = self._end
+        self._x[i] = x_m
+        self._y[i] = y_m
+        self._surface[i] = surface_temp_c
+        self._air[i] = air_temp_c
+        self._room[i] = room_id
+        self._end = i + 1
+        if self._end - self._start > self.capacity:
+            self._start += 1
+        self.version += 1
+
+    @property
+    def x_m(self) -> np.ndarray:
+        return self._x[self._start:self._end]
+
+    @property
+    def y_m(self) -> np.ndarray:
+        return self._y[self._start:self._end]
+
+    @property
+    def surface_temp_c(self) -> np.ndarray:
+        return self._surface[self._start:self._end]
+
+    @property
+    def air_temp_c(self) -> np.ndarray:
+        return self._air[self._start:self._end]
+
+    @property
+    def room_id(self) -> np.ndarray:
+        return self._room[self._start:self._end]
+
+
 def wasted_power_w(air_temp_c: float, volume_m3: float = ROOM_VOLUME_M3) -> float:
     """
     Sustainability: wasted heating power (Watts).
@@ -37,12 +103,12 @@ def wasted_power_w(air_temp_c: float, volume_m3: float = ROOM_VOLUME_M3) -> floa
     return over * volume_m3 * WATT_PER_DEGREE_PER_M3
 
 
-def compute_analytics(thermal_history: list[ThermalReading]) -> dict:
+def compute_analytics(air_temps: np.ndarray) -> dict:
     """
-    Compute analytics from accumulated thermal readings.
-    Returns dict suitable for FrontendUpdate.analytics.
+    Compute analytics from the air temperatures of accumulated thermal readings
+    (any order). Returns dict suitable for FrontendUpdate.analytics.
     """
-    if not thermal_history:
+    if not len(air_temps):
         return {
             "wasted_power_w": 0.0,
             "hot_zone_count": 0,
@@ -52,10 +118,9 @@ def compute_analytics(thermal_history: list[ThermalReading]) -> dict:
             "overheat_threshold_c": OVERHEAT_THRESHOLD_C,
         }
 
-    temps = [r.air_temp_c for r in thermal_history]
-    hot_count = sum(1 for t in temps if t > OVERHEAT_THRESHOLD_C)
-    avg_temp = sum(temps) / len(temps)
-    max_temp = max(temps)
+    hot_count = int(np.count_nonzero(air_temps > OVERHEAT_THRESHOLD_C))
+    avg_temp = float(air_temps.mean())
+    max_temp = float(air_temps.max())
 
     # Wasted power: use max overtemperature in room as proxy for worst zone
     worst_over = max(0.0, max_temp - SETPOINT_C)
@@ -72,19 +137,27 @@ def compute_analytics(thermal_history: list[ThermalReading]) -> dict:
 
 
 def thermal_to_frontend_points(
-    thermal_history: list[ThermalReading],
+    thermal_history: ThermalHistory,
     max_points: int = 500,
 ) -> list[dict]:
     """Convert thermal history to list of dicts for heat map display."""
-    recent = thermal_history[-max_points:] if len(thermal_history) > max_points else thermal_history
+    recent = slice(-max_points, None)
+    air = thermal_history.air_temp_c[recent]
     return [
         {
-            "x_m": r.x_m,
-            "y_m": r.y_m,
-            "surface_temp_c": r.surface_temp_c,
-            "air_temp_c": r.air_temp_c,
-            "room_id": r.room_id,
-            "is_overheated": r.air_temp_c > OVERHEAT_THRESHOLD_C,
+            "x_m": x,
+            "y_m": y,
+            "surface_temp_c": surface,
+            "air_temp_c": air_c,
+            "room_id": room,
+            "is_overheated": hot,
         }
-        for r in recent
+        for x, y, surface, air_c, room, hot in zip(
+            thermal_history.x_m[recent].tolist(),
+            thermal_history.y_m[recent].tolist(),
+            thermal_history.surface_temp_c[recent].tolist(),
+            air.tolist(),
+            thermal_history.room_id[recent].tolist(),
+            (air > OVERHEAT_THRESHOLD_C).tolist(),
+        )
     ]
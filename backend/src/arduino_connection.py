@@ -6,14 +6,17 @@ and produces FrontendUpdate for WebSocket broadcast.
 import math
 from typing import Callable
 
-from .models import ArduinoReadingsPayload, FrontendUpdate, RobotPose
-from .point_cloud import polar_to_cartesian, readings_to_points, add_to_ring_buffer
+import numpy as np
+
+from jit import NUMBA_AVAILABLE, njit
+from .models import ArduinoReadingsPayload, FrontendUpdate, ReadingPoint, RobotPose
+from .point_cloud import PointCloudBuffer, polar_to_cartesian_array, sweep_directions
 from .occupancy_grid import OccupancyGrid
-from .idw_interpolation import idw_grid_for_frontend
+from .idw_interpolation import IDWAccumulator
 from .path_planning import PathPlanner, RobotState, SensorReading
 from .kalman_imu import KalmanHeadingFilter
 from .analytics import (
-    ThermalReading,
+    ThermalHistory,
     compute_analytics,
     thermal_to_frontend_points,
 )
@@ -27,27 +30,47 @@ SWEEP_BINS = int(180.0 / BIN_ANGLE)
 
 MAX_POINT_CLOUD_SIZE = 2000
 DISPLAY_POINT_LIMIT = 2 * SWEEP_BINS
-
-
-def _bin_readings_to_sweep(readings: list[tuple[float, float]]) -> list[float]:
-    """Bin (angle, distance) readings into 12 sectors. Invalid = 400 (far) for nav."""
-    sweep = [0.0] * SWEEP_BINS
-    counts = [0] * SWEEP_BINS
-
-    for angle_deg, distance_cm in readings:
-        d = distance_cm if 0 < distance_cm <= 400 else 400.0
-        angle_norm = (angle_deg % 360 + 360) % 360
-        idx = int(round(angle_norm / BIN_ANGLE)) % SWEEP_BINS
-        sweep[idx] += d
+THERMAL_HISTORY_SIZE = 500
+
+# Motor command for PathPlanner actions that map to one command regardless of turn.
+# *_RIGHT actions are absent on purpose: a negative turn still sends "L".
+_ACTION_TO_MOTOR_CMD = {
+    "IDLE": "S",
+    "STOP": "S",
+    "STOP_AND_SAMPLE": "S",
+    "FORWARD": "F",
+    "LAWNMOWER_FORWARD": "F",
+    "LAWNMOWER_BACK": "B",
+    "TURN_LEFT": "L",
+    "AVOID_TURN_LEFT": "L",
+    "WALL_CORRECT_LEFT": "L",
+}
+
+
+@njit(cache=True)
+def _bin_sweep(angles: np.ndarray, dists: np.ndarray) -> np.ndarray:
+    sums = np.zeros(SWEEP_BINS)
+    counts = np.zeros(SWEEP_BINS, dtype=np.int64)
+    for i in range(len(angles)):
+        d = dists[i]
+        # np.rint rounds half to even, like round(); 360 itself lands back in bin 0
+        idx = int(np.rint(angles[i] % 360.0 / BIN_ANGLE)) % SWEEP_BINS
+        sums[idx] += d if 0 < d <= 400 else 400.0
         counts[idx] += 1
-
     for i in range(SWEEP_BINS):
-        if counts[i] > 0:
-            sweep[i] /= counts[i]
-        else:
-            sweep[i] = 150.0
+        sums[i] = sums[i] / counts[i] if counts[i] else 150.0
+    return sums
 
-    return sweep
+
+def _bin_readings_to_sweep(angles: np.ndarray, dists: np.ndarray) -> np.ndarray:
+    """Bin readings (parallel angle/distance arrays) into 12 sectors. Invalid = 400 (far) for nav."""
+    if NUMBA_AVAILABLE:
+        return _bin_sweep(angles, dists)
+    d = np.where((dists > 0) & (dists <= 400), dists, 400.0)
+    idx = np.rint(np.mod(angles, 360.0) / BIN_ANGLE).astype(np.intp) % SWEEP_BINS
+    sums = np.bincount(idx, weights=d, minlength=SWEEP_BINS)
+    counts = np.bincount(idx, minlength=SWEEP_BINS)
+    return np.where(counts > 0, sums / np.maximum(counts, 1), 150.0)
 
 
 class ArduinoConnection():
@@ -61,15 +84,20 @@ class ArduinoConnection():
         self.occupancy_grid = OccupancyGrid(
             width_m=10.0, height_m=10.0, resolution_m=0.1,
         )
-        self.point_cloud: list[list[float]] = []
-        self.last_sweep_cm: list[float] = [150.0] * SWEEP_BINS
+        self.point_cloud = PointCloudBuffer(MAX_POINT_CLOUD_SIZE)
+        self._sweep = np.full(SWEEP_BINS, 150.0)  # blended sweep; last_sweep_cm is its list
+        self.last_sweep_cm: list[float] = self._sweep.tolist()
         self.last_action = "IDLE"
         self._timestamp_ms = 0
         self._last_timestamp_ms = 0
-        self.thermal_history: list[ThermalReading] = []
+        self.thermal_history = ThermalHistory(THERMAL_HISTORY_SIZE)
         self.last_air_temp_c: float | None = None
         self.last_humidity_pct: float | None = None
         self.last_gyro_z: float | None = None
+        self._thermal_cache_version = -1
+        self._thermal_cache: tuple | None = None
+        # Heat grid over thermal_history, updated per reading instead of rebuilt per frame
+        self._idw = IDWAccumulator(-5.0, 5.0, -5.0, 5.0, resolution_m=0.2)
 
     def receive_readings(self, payload: ArduinoReadingsPayload) -> FrontendUpdate:
         """
@@ -82,12 +110,11 @@ class ArduinoConnection():
         self._last_timestamp_ms = payload.timestamp_ms
         dt_s = max(0.01, min(2.0, dt_ms / 1000.0))
 
+        # One pass over the pydantic readings; everything below works on plain tuples
+        raw = [(r.angle, r.distance, r.gyro_z) for r in payload.readings]
+
         # Extract gyro_z from first reading with IMU data
-        gyro_z_val: float | None = None
-        for r in payload.readings:
-            if r.gyro_z is not None:
-                gyro_z_val = r.gyro_z
-                break
+        gyro_z_val = next((g for _, _, g in raw if g is not None), None)
         if gyro_z_val is not None:
             self.last_gyro_z = gyro_z_val
             if not CART_STATIONARY:
@@ -96,38 +123,36 @@ class ArduinoConnection():
 
         self._timestamp_ms = payload.timestamp_ms
 
-        # Build readings list
-        readings = [(r.angle, r.distance) for r in payload.readings]
+        # Parallel angle/distance arrays for the readings
+        angles = np.array([a for a, _, _ in raw], dtype=np.float64)
+        dists = np.array([d for _, d, _ in raw], dtype=np.float64)
 
         # Merge into sweep (accumulate with existing for smoother data)
-        new_sweep = _bin_readings_to_sweep(readings)
+        new_sweep = _bin_readings_to_sweep(angles, dists)
         # Blend with previous sweep for stability
-        sweep_cm = [
-            0.5 * self.last_sweep_cm[i] + 0.5 * new_sweep[i]
-            for i in range(SWEEP_BINS)
-        ]
+        self._sweep = 0.5 * self._sweep + 0.5 * new_sweep
+        sweep_cm = self._sweep.tolist()
         self.last_sweep_cm = sweep_cm
 
-        # Convert to 3D points and append to point cloud
-        new_points = readings_to_points(
-            readings,
-            self.robot_state.x,
-            self.robot_state.y,
-            self.robot_state.heading_deg,
-        )
+        rx = self.robot_state.x
+        ry = self.robot_state.y
+        hd = self.robot_state.heading_deg
+        # One sin/cos pass over the angles, shared by the point cloud and the grid update
+        dir_x, dir_z = sweep_directions(angles, hd)
 
-        self.point_cloud = add_to_ring_buffer(
-            self.point_cloud, new_points, MAX_POINT_CLOUD_SIZE
+        # Convert to 3D points (cm precision) and append to point cloud (sanity filter: 4m max)
+        keep = (dists > 0) & (dists < 400)
+        px, py, pz = polar_to_cartesian_array(
+            angles[keep], dists[keep], rx, ry, hd, directions=(dir_x[keep], dir_z[keep]),
         )
+        self.point_cloud.extend(np.column_stack((px, py, pz)).round(2))
 
         # Update occupancy grid: use all readings (invalid = max range for mapping)
-        rx = self.robot_state.x
-        ry = self.robot_state.y
-        hd = self.robot_state.heading_deg
-        for angle_deg, distance_cm in readings:
-            d = min(400.0, max(1.0, distance_cm)) if distance_cm else 400.0
-            wx, _, wz = polar_to_cartesian(angle_deg, d, rx, ry, hd)
-            self.occupancy_grid.update_ray(rx, ry, wx, wz)
+        ray_dists = np.where(dists != 0, np.clip(dists, 1.0, 400.0), 400.0)
+        wx, _, wz = polar_to_cartesian_array(
+            angles, ray_dists, rx, ry, hd, directions=(dir_x, dir_z),
+        )
+        self.occupancy_grid.update_rays(rx, ry, wx, wz)
 
         # Store latest DHT readings for frontend
         if payload.air_temp_c is not None:
@@ -152,17 +177,18 @@ class ArduinoConnection():
             surface = payload.surface_temp_c or payload.air_temp_c or 20.0
             air = payload.air_temp_c or payload.surface_temp_c or 20.0
             room_id = int(self.robot_state.x / 1.5)  # ~1.5m per room
-            self.thermal_history.append(
-                ThermalReading(
-                    x_m=self.robot_state.x,
-                    y_m=self.robot_state.y,
-                    surface_temp_c=surface,
-                    air_temp_c=air,
-                    room_id=max(0, room_id),
-                )
+            history = self.thermal_history
+            if len(history) == history.capacity:
+                # The oldest reading is about to be evicted: take it out of the heat grid too
+                self._idw.remove(history.x_m[0], history.y_m[0], history.air_temp_c[0])
+            self._idw.add(self.robot_state.x, self.robot_state.y, air)
+            history.append(
+                x_m=self.robot_state.x,
+                y_m=self.robot_state.y,
+                surface_temp_c=surface,
+                air_temp_c=air,
+                room_id=max(0, room_id),
             )
-            if len(self.thermal_history) > 500:
-                self.thermal_history = self.thermal_history[-500:]
 
         # Occupancy-grid navigation
         occupancy_cmd, occupancy_turn = self.occupancy_grid.get_best_direction(
@@ -188,43 +214,37 @@ class ArduinoConnection():
             self.robot_state.y += move * math.sin(rad)
             self.robot_state.distance_travelled += move
 
-        analytics = compute_analytics(self.thermal_history)
-        thermal_points = thermal_to_frontend_points(self.thermal_history)
-        thermal_grid, thermal_bounds = idw_grid_for_frontend(
-            self.thermal_history,
-            x_min=-5.0, x_max=5.0, y_min=-5.0, y_max=5.0,
-            resolution_m=0.2,
-        )
-        display_points = self.point_cloud[-DISPLAY_POINT_LIMIT:]
-        motor_cmd = self._action_to_motor_cmd(action, turn_deg)
-        self._pending_motor_cmd = motor_cmd
-        return FrontendUpdate(
-            points=display_points,
-            robot=RobotPose(
-                x=self.robot_state.x,
-                y=self.robot_state.y,
-                heading_deg=self.robot_state.heading_deg,
-            ),
-            action=action,
-            sweep_cm=sweep_cm,
-            thermal_points=thermal_points,
-            analytics=analytics,
-            air_temp_c=self.last_air_temp_c,
-            humidity_pct=self.last_humidity_pct,
-            gyro_z=self.last_gyro_z,
-            occupancy_grid=self.occupancy_grid.get_grid_for_frontend(),
-            occupancy_bounds=self.occupancy_grid.get_bounds(),
-            thermal_grid=thermal_grid,
-            thermal_grid_bounds=thermal_bounds,
-        )
+        self._pending_motor_cmd = self._action_to_motor_cmd(action, turn_deg)
+        return self.get_current_state()
+
+    def _thermal_outputs(self) -> tuple:
+        """(analytics, thermal_points, thermal_grid, thermal_bounds); recomputed only when
+        thermal_history has had new readings since the last call."""
+        version = self.thermal_history.version
+        if self._thermal_cache_version != version:
+            self._thermal_cache = (
+                compute_analytics(self.thermal_history.air_temp_c),
+                thermal_to_frontend_points(self.thermal_history),
+                *self._idw.grid_for_frontend(),
+            )
+            self._thermal_cache_version = version
+        return self._thermal_cache
+
+    def _display_points(self) -> list[list[float]]:
+        """Newest DISPLAY_POINT_LIMIT points, oldest first."""
+        return self.point_cloud.tail(DISPLAY_POINT_LIMIT).tolist()
 
     def _action_to_motor_cmd(self, action: str, turn_deg: float) -> str:
         """Convert planner action to Arduino single-char command: F, B, L, R, S."""
+        cmd = _ACTION_TO_MOTOR_CMD.get(action)
+        if cmd is not None:
+            return cmd
+        # Turn-dependent actions (e.g. SWEEP_TURN, *_RIGHT): keyword match, then turn sign
         if "STOP" in action or "IDLE" in action:
             return "S"
-        if "FORWARD" in action or "LAWNMOWER_FORWARD" in action:
+        if "FORWARD" in action:
             return "F"
-        if "BACK" in action or "LAWNMOWER_BACK" in action:
+        if "BACK" in action:
             return "B"
         if "LEFT" in action or turn_deg < 0:
             return "L"
@@ -239,18 +259,15 @@ class ArduinoConnection():
         return cmd
 
     def get_current_state(self) -> FrontendUpdate:
-        """Return current state for new WebSocket clients."""
-        analytics = compute_analytics(self.thermal_history)
-        thermal_points = thermal_to_frontend_points(self.thermal_history)
-        thermal_grid, thermal_bounds = idw_grid_for_frontend(
-            self.thermal_history,
-            x_min=-5.0, x_max=5.0, y_min=-5.0, y_max=5.0,
-            resolution_m=0.2,
-        )
-        display_points = self.point_cloud[-DISPLAY_POINT_LIMIT:]
-        return FrontendUpdate(
-            points=display_points,
-            robot=RobotPose(
+        """
+        Return current state (the reply to each packet, and the snapshot for new
+        WebSocket clients). Every field is built here from already-typed values, so the
+        models are assembled with model_construct() and skip pydantic validation.
+        """
+        analytics, thermal_points, thermal_grid, thermal_bounds = self._thermal_outputs()
+        return FrontendUpdate.model_construct(
+            points=self._display_points(),
+            robot=RobotPose.model_construct(
                 x=self.robot_state.x,
                 y=self.robot_state.y,
                 heading_deg=self.robot_state.heading_deg,
@@ -261,14 +278,29 @@ class ArduinoConnection():
             analytics=analytics,
             air_temp_c=self.last_air_temp_c,
             humidity_pct=self.last_humidity_pct,
-            gyro_z=self.last_gyro_z,
             occupancy_grid=self.occupancy_grid.get_grid_for_frontend(),
             occupancy_bounds=self.occupancy_grid.get_bounds(),
             thermal_grid=thermal_grid,
             thermal_grid_bounds=thermal_bounds,
+            gyro_z=self.last_gyro_z,
         )
 
 
+def warm_up_jit() -> None:
+    """
+    Push one dummy packet through a throwaway connection so the numba kernels on the
+    packet path (sweep binning, ray update) are compiled, or loaded from the
+    on-disk cache, before the first real packet. No-op without numba.
+    """
+    if not NUMBA_AVAILABLE:
+        return
+    ArduinoConnection().receive_readings(ArduinoReadingsPayload(
+        readings=[ReadingPoint(angle=0.0, distance=100.0)],
+        timestamp_ms=1,
+        air_temp_c=20.0,
+    ))
+
+
 # Singleton instance
 _connection: ArduinoConnection | None = None
 
@@ -12,7 +12,7 @@ Pipeline: FakeSensorReader → polar readings + thermal → ArduinoReadingsPaylo
 
 import time
 import random
-from .models import ArduinoReadingsPayload, ReadingPoint
+from .models import ArduinoReadingsPayload
 from .path_planning import FakeSensorReader, RobotState
 
 SWEEP_BINS = 12
@@ -38,12 +38,13 @@ def generate_fake_payload(
 
     # Convert sweep_cm to polar readings (inverse of binning)
     # Each bin i → angle = i * 30°, distance = sweep_cm[i] + noise
+    # Plain dicts: the payload validates all readings in one pass, which is cheaper
+    # than building each ReadingPoint separately
     readings = []
     for i in range(SWEEP_BINS):
-        angle = i * BIN_ANGLE
         dist = reading.sweep_cm[i] + random.uniform(-1.5, 1.5)
         dist = max(2.0, min(400.0, dist))  # Clamp to sensor range
-        readings.append(ReadingPoint(angle=angle, distance=round(dist, 1)))
+        readings.append({"angle": i * BIN_ANGLE, "distance": round(dist, 1)})
 
     payload_dict = {"readings": readings, "timestamp_ms": timestamp_ms}
 
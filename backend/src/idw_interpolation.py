@@ -8,9 +8,48 @@ from typing import Sequence
 
 import numpy as np
 
+from jit import NUMBA_AVAILABLE, njit, prange
+from .analytics import ThermalHistory
+
+# Max elements per (rows, cols, samples) temporary in idw_interpolate (~4 MB of float32)
+_IDW_BLOCK_ELEMS = 1 << 20
+
+
+@njit(cache=True, parallel=True)
+def _idw_grid(grid, xs, ys, ts, cell_x, cell_y, lo, hi, power, max_dist_m):
+    """
+    IDW per cell, rows in parallel. Samples are sorted by x; lo[j]:hi[j] is the slice
+    within max_dist_m of column j in x, so samples out of reach are never visited.
+    """
+    max_d2 = max_dist_m * max_dist_m
+    for i in prange(len(cell_y)):
+        cy = cell_y[i]
+        for j in range(len(cell_x)):
+            cx = cell_x[j]
+            wsum = 0.0
+            num = 0.0
+            for k in range(lo[j], hi[j]):
+                dx = xs[k] - cx
+                dy = ys[k] - cy
+                d2 = dx * dx + dy * dy
+                if power == 2.0:
+                    d2 = max(d2, 0.05 * 0.05)  # avoid division by zero
+                    if d2 > max_d2:
+                        continue
+                    w = 1.0 / d2
+                else:
+                    d = max(np.sqrt(d2), 0.05)
+                    if d > max_dist_m:
+                        continue
+                    w = d ** -power
+                wsum += w
+                num += w * ts[k]
+            if wsum > 0:
+                grid[i, j] = num / wsum
+
 
 def idw_interpolate(
-    samples: Sequence[tuple[float, float, float]],
+    samples: Sequence[tuple[float, float, float]] | np.ndarray,
     x_min: float,
     x_max: float,
     y_min: float,
@@ -23,7 +62,7 @@ def idw_interpolate(
     Compute IDW interpolation over a 2D grid.
 
     Args:
-        samples: List of (x_m, y_m, temp_c)
+        samples: List of (x_m, y_m, temp_c), or an (N, 3) array of the same
         x_min, x_max, y_min, y_max: Grid bounds in metres
         resolution_m: Cell size
         power: IDW exponent (default 2)
@@ -32,7 +71,7 @@ def idw_interpolate(
     Returns:
         (grid, x_min, x_max, y_min, y_max) where grid is (rows, cols) with NaN for no data
     """
-    if not samples:
+    if len(samples) == 0:
         cols = max(1, int((x_max - x_min) / resolution_m))
         rows = max(1, int((y_max - y_min) / resolution_m))
         return (np.full((rows, cols), float("nan")), x_min, x_max, y_min, y_max)
@@ -41,31 +80,130 @@ def idw_interpolate(
     rows = max(1, int((y_max - y_min) / resolution_m))
     grid = np.full((rows, cols), float("nan"), dtype=np.float32)
 
-    xs = np.array([s[0] for s in samples])
-    ys = np.array([s[1] for s in samples])
-    ts = np.array([s[2] for s in samples])
-
-    for i in range(rows):
-        for j in range(cols):
-            cx = x_min + (j + 0.5) * resolution_m
-            cy = y_min + (i + 0.5) * resolution_m
-            dx = xs - cx
-            dy = ys - cy
-            d = np.sqrt(dx * dx + dy * dy)
-            d = np.maximum(d, 0.05)  # avoid division by zero
-            mask = d <= max_dist_m
-            if not np.any(mask):
-                continue
-            w = np.where(mask, 1.0 / (d ** power), 0.0)
-            wsum = np.sum(w)
-            if wsum > 0:
-                grid[i, j] = float(np.sum(w * ts) / wsum)
+    xs, ys, ts = np.asarray(samples, dtype=np.float64).reshape(-1, 3).T
+    cell_x = x_min + (np.arange(cols) + 0.5) * resolution_m
+    cell_y = y_min + (np.arange(rows) + 0.5) * resolution_m
+
+    if NUMBA_AVAILABLE:
+        order = np.argsort(xs, kind="stable")
+        xs, ys, ts = xs[order], ys[order], ts[order]
+        lo = np.searchsorted(xs, cell_x - max_dist_m, side="left")
+        hi = np.searchsorted(xs, cell_x + max_dist_m, side="right")
+        _idw_grid(grid, xs, ys, ts, cell_x, cell_y, lo, hi, float(power), float(max_dist_m))
+        return (grid, x_min, x_max, y_min, y_max)
+
+    # float32 from here: the block buffer is memory-bound, and the grid is float32 anyway
+    dx2 = np.square(xs - cell_x[:, None]).astype(np.float32)  # (cols, N)
+    dy2 = np.square(ys - cell_y[:, None]).astype(np.float32)  # (rows, N)
+    # Columns (t, 1): one matmul over the weights yields both Σw·t and Σw
+    ts_ones = np.column_stack((ts, np.ones_like(ts))).astype(np.float32)
+
+    # Whole grid rows at a time, capped so the (rows, cols, N) temporary stays small;
+    # every step after the first runs in place on that one buffer
+    block = max(1, _IDW_BLOCK_ELEMS // (cols * len(xs)))
+    for r0 in range(0, rows, block):
+        w = dy2[r0:r0 + block, None, :] + dx2[None, :, :]  # squared distances
+        if power == 2.0:
+            # Default exponent: weight straight from the squared distance, no sqrt/pow
+            np.maximum(w, 0.05 * 0.05, out=w)  # avoid division by zero
+            np.reciprocal(w, out=w)
+            w *= w >= 1.0 / (max_dist_m * max_dist_m)
+        else:
+            np.sqrt(w, out=w)
+            np.maximum(w, 0.05, out=w)  # avoid division by zero
+            far = w > max_dist_m
+            np.power(w, -power, out=w)
+            w[far] = 0.0
+        sums = w @ ts_ones
+        num = sums[..., 0]
+        wsum = sums[..., 1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            grid[r0:r0 + block] = np.where(wsum > 0, num / wsum, np.nan)
 
     return (grid, x_min, x_max, y_min, y_max)
 
 
+class IDWAccumulator:
+    """
+    idw_interpolate() kept up to date one sample at a time. Per cell it holds Σw·t, Σw
+    and the number of samples in reach; add() and remove() touch only the cells within
+    max_dist_m of the sample, so a frame with a few new readings costs a few small
+    discs instead of a full (rows, cols, N) pass.
+    """
+
+    def __init__(
+        self,
+        x_min: float,
+        x_max: float,
+        y_min: float,
+        y_max: float,
+        resolution_m: float = 0.1,
+        power: float = 2.0,
+        max_dist_m: float = 2.0,
+    ):
+        self.bounds = (x_min, x_max, y_min, y_max)
+        self.resolution_m = resolution_m
+        self.power = power
+        self.max_dist_m = max_dist_m
+        cols = max(1, int((x_max - x_min) / resolution_m))
+        rows = max(1, int((y_max - y_min) / resolution_m))
+        self._cell_x = x_min + (np.arange(cols) + 0.5) * resolution_m
+        self._cell_y = y_min + (np.arange(rows) + 0.5) * resolution_m
+        # float64 so add/remove round trips don't drift; the count makes "no data" exact
+        self._num = np.zeros((rows, cols))
+        self._den = np.zeros((rows, cols))
+        self._count = np.zeros((rows, cols), dtype=np.int64)
+
+    def _disc(self, x_m: float, y_m: float) -> tuple[slice, slice, np.ndarray, np.ndarray]:
+        """(row slice, col slice, in-reach mask, weights) for the box around a sample."""
+        c0 = np.searchsorted(self._cell_x, x_m - self.max_dist_m, side="left")
+        c1 = np.searchsorted(self._cell_x, x_m + self.max_dist_m, side="right")
+        r0 = np.searchsorted(self._cell_y, y_m - self.max_dist_m, side="left")
+        r1 = np.searchsorted(self._cell_y, y_m + self.max_dist_m, side="right")
+        d2 = np.square(self._cell_y[r0:r1, None] - y_m) + np.square(self._cell_x[None, c0:c1] - x_m)
+        # Same weighting and cut-off as idw_interpolate
+        if self.power == 2.0:
+            d2 = np.maximum(d2, 0.05 * 0.05)
+            near = d2 <= self.max_dist_m * self.max_dist_m
+            w = 1.0 / d2
+        else:
+            d = np.maximum(np.sqrt(d2), 0.05)
+            near = d <= self.max_dist_m
+            w = d ** -self.power
+        return slice(r0, r1), slice(c0, c1), near, np.where(near, w, 0.0)
+
+    def add(self, x_m: float, y_m: float, temp_c: float) -> None:
+        rows, cols, near, w = self._disc(x_m, y_m)
+        self._num[rows, cols] += w * temp_c
+        self._den[rows, cols] += w
+        self._count[rows, cols] += near
+
+    def remove(self, x_m: float, y_m: float, temp_c: float) -> None:
+        """Undo an earlier add() of the same sample (e.g. when it leaves the history)."""
+        rows, cols, near, w = self._disc(x_m, y_m)
+        self._num[rows, cols] -= w * temp_c
+        self._den[rows, cols] -= w
+        self._count[rows, cols] -= near
+
+    def grid(self) -> np.ndarray:
+        """(rows, cols) float32 grid, NaN where no sample is in reach."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self._count > 0, self._num / self._den, np.nan).astype(np.float32)
+
+    def grid_for_frontend(self) -> tuple[list[list[float]], tuple[float, float, float, float]]:
+        """Same output as idw_grid_for_frontend() over the samples added so far."""
+        return (_grid_to_frontend(self.grid()), self.bounds)
+
+
+def _grid_to_frontend(grid: np.ndarray) -> list[list[float]]:
+    # Convert NaN to sentinel -999 (no data); JSON doesn't support NaN. Temperatures are
+    # rounded to 0.01 °C, well below sensor precision, to keep the payload short.
+    NO_DATA = -999.0
+    return np.where(np.isfinite(grid), grid.round(2), NO_DATA).tolist()
+
+
 def idw_grid_for_frontend(
-    thermal_history: Sequence[object],
+    thermal_history: ThermalHistory,
     x_min: float = -5.0,
     x_max: float = 5.0,
     y_min: float = -5.0,
@@ -73,24 +211,13 @@ def idw_grid_for_frontend(
     resolution_m: float = 0.2,
 ) -> tuple[list[list[float]], tuple[float, float, float, float]]:
     """
-    Produce thermal grid for frontend from thermal_history (ThermalReading objects).
-    Returns (grid as list of lists, bounds tuple).
+    Produce thermal grid for frontend from thermal_history (air temperature at each
+    reading position). Returns (grid as list of lists, bounds tuple).
     """
-    samples = [
-        (r.x_m, r.y_m, r.air_temp_c)
-        for r in thermal_history
-        if hasattr(r, "x_m") and hasattr(r, "y_m") and hasattr(r, "air_temp_c")
-    ]
+    samples = np.column_stack(
+        (thermal_history.x_m, thermal_history.y_m, thermal_history.air_temp_c)
+    )
     grid, x_min, x_max, y_min, y_max = idw_interpolate(
         samples, x_min, x_max, y_min, y_max, resolution_m=resolution_m
     )
-    # Convert NaN to sentinel -999 (no data); JSON doesn't support NaN
-    NO_DATA = -999.0
-    grid_list: list[list[float]] = []
-    for row in grid:
-        r = []
-        for v in row:
-            val = float(v)
-            r.append(NO_DATA if (val != val or val == float("inf") or val == float("-inf")) else val)
-        grid_list.append(r)
-    return (grid_list, (x_min, x_max, y_min, y_max))
+    return (_grid_to_frontend(grid), (x_min, x_max, y_min, y_max))
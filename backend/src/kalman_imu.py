@@ -50,28 +50,29 @@ class KalmanHeadingFilter:
         delta_t = dt if dt is not None else self.dt
 
         # Predict: heading += (gyro_z - bias) * dt
-        gyro_corrected = gyro_z - self.state.gyro_bias
-        self.state.heading_deg += gyro_corrected * delta_t
+        state = self.state
+        heading = state.heading_deg + (gyro_z - state.gyro_bias) * delta_t
 
-        # Wrap to [0, 360)
-        self.state.heading_deg = self.state.heading_deg % 360.0
-        if self.state.heading_deg < 0:
-            self.state.heading_deg += 360.0
+        # Wrap to [0, 360). Python's float % already lands there for any sign, and
+        # per-update steps are small, so only wrap when the heading left the range
+        if not 0.0 <= heading < 360.0:
+            heading %= 360.0
+        state.heading_deg = heading
 
         # Predict covariance (simplified 1D)
-        self.state.P_heading += self.q_heading * delta_t
-        self.state.P_bias += self.q_bias * delta_t
+        state.P_heading += self.q_heading * delta_t
+        state.P_bias += self.q_bias * delta_t
 
         # Optional: when stationary (accel magnitude ~1g), use accel to correct bias
         # For now we rely on process model; bias adapts slowly via q_bias
         # Future: if accel suggests stationary, do measurement update with heading_measurement=prior
 
-        return self.state.heading_deg
+        return heading
 
     def get_heading_deg(self) -> float:
         """Return current heading [0, 360)."""
-        h = self.state.heading_deg % 360.0
-        return h + 360.0 if h < 0 else h
+        # float % 360.0 is never negative; the modulo only matters after reset()
+        return self.state.heading_deg % 360.0
 
     def reset(self, heading_deg: float = 0.0):
         """Reset filter state."""
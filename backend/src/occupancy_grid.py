@@ -4,22 +4,21 @@ Uses Bresenham's line algorithm and Bayesian log-odds update.
 """
 
 import math
+from functools import lru_cache
 from typing import Iterator
 
 import numpy as np
 
+from jit import njit
 
+
+@lru_cache(maxsize=32)
 def _log_odds(p: float) -> float:
-    """Convert probability to log-odds: L = log(p / (1-p))."""
+    """Convert probability to log-odds: L = log(p / (1-p)). Cached: thresholds repeat."""
     p = max(1e-6, min(1 - 1e-6, p))
     return math.log(p / (1 - p))
 
 
-def _prob_from_log_odds(L: float) -> float:
-    """Convert log-odds back to probability."""
-    return 1.0 / (1.0 + math.exp(-L))
-
-
 def bresenham_line(
     x0: int, y0: int, x1: int, y1: int,
 ) -> Iterator[tuple[int, int]]:
@@ -47,6 +46,49 @@ def bresenham_line(
             y += sy
 
 
+@njit(cache=True)
+def _update_rays(grid, robot_x, robot_y, hit_xs, hit_ys, x_min, y_min, resolution, l_miss, l_hit):
+    """Log-odds update for rays from one robot position: cells along each ray (Bresenham,
+    endpoint excluded) get l_miss, the end cell l_hit; values clamp to [-10, 10].
+    l_miss/l_hit are float32 so the sums round exactly as NumPy's float32 in-place add."""
+    rows, cols = grid.shape
+    rx = int((robot_x - x_min) / resolution)
+    ry = int((robot_y - y_min) / resolution)
+    robot_in = 0 <= rx < cols and 0 <= ry < rows
+    for i in range(len(hit_xs)):
+        hx = int((hit_xs[i] - x_min) / resolution)
+        hy = int((hit_ys[i] - y_min) / resolution)
+        hit_in = 0 <= hx < cols and 0 <= hy < rows
+        if not robot_in and not hit_in:
+            continue
+        # An off-grid end collapses onto the other one, as _world_to_cell returning None did
+        x0, y0 = (rx, ry) if robot_in else (hx, hy)
+        x1, y1 = (hx, hy) if hit_in else (x0, y0)
+
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        x, y = x0, y0
+        while not (x == x1 and y == y1):
+            if 0 <= x < cols and 0 <= y < rows:
+                grid[y, x] = max(-10.0, min(10.0, grid[y, x] + l_miss))
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x += sx
+            if e2 <= dx:
+                err += dx
+                y += sy
+
+        grid[y1, x1] = max(-10.0, min(10.0, grid[y1, x1] + l_hit))
+
+
+# Headings tried by get_best_direction, in order of preference (0 = straight ahead)
+_CANDIDATE_TURNS = (0, 45, -45, 90, -90, 135, -135)
+
+
 class OccupancyGrid:
     """
     Probabilistic 2D occupancy grid. Each cell in [0, 1]: 0=empty, 0.5=unknown, 1=occupied.
@@ -91,35 +133,27 @@ class OccupancyGrid:
         Update grid for one ultrasonic ray: cells along path get p_miss (empty),
         hit cell gets p_hit (occupied).
         """
-        c0 = self._world_to_cell(robot_x, robot_y)
-        c1 = self._world_to_cell(hit_x, hit_y)
-        if c0 is None and c1 is None:
-            return
-        if c0 is None:
-            c0 = c1
-        if c1 is None:
-            c1 = c0
-
-        x0, y0 = c0
-        x1, y1 = c1
-
-        for (cx, cy) in bresenham_line(x0, y0, x1, y1):
-            if 0 <= cx < self.cols and 0 <= cy < self.rows:
-                self.grid[cy, cx] += self._L_miss
-                self.grid[cy, cx] = max(-10.0, min(10.0, self.grid[cy, cx]))
-
-        if 0 <= x1 < self.cols and 0 <= y1 < self.rows:
-            self.grid[y1, x1] += self._L_hit
-            self.grid[y1, x1] = max(-10.0, min(10.0, self.grid[y1, x1]))
+        self.update_rays(robot_x, robot_y, np.array([hit_x]), np.array([hit_y]))
+
+    def update_rays(
+        self, robot_x: float, robot_y: float, hit_xs: np.ndarray, hit_ys: np.ndarray,
+    ) -> None:
+        """update_ray() for a batch of hit points seen from the same robot position."""
+        _update_rays(
+            self.grid, float(robot_x), float(robot_y),
+            np.asarray(hit_xs, dtype=np.float64), np.asarray(hit_ys, dtype=np.float64),
+            self.x_min, self.y_min, self.resolution,
+            np.float32(self._L_miss), np.float32(self._L_hit),
+        )
 
     def get_grid_prob(self) -> np.ndarray:
         """Return grid as probabilities [0, 1]. Shape (rows, cols)."""
-        return np.vectorize(_prob_from_log_odds)(self.grid)
+        return 1.0 / (1.0 + np.exp(-self.grid.astype(np.float64)))
 
     def get_grid_for_frontend(self) -> list[list[float]]:
-        """Return grid as nested list of probabilities for JSON serialization."""
-        p = self.get_grid_prob()
-        return p.tolist()
+        """Return grid as nested list of probabilities for JSON serialization, rounded to
+        2 decimals (display precision) so the payload stays short."""
+        return self.get_grid_prob().round(2).tolist()
 
     def get_bounds(self) -> tuple[float, float, float, float]:
         """Return (x_min, x_max, y_min, y_max) in metres."""
@@ -131,15 +165,14 @@ class OccupancyGrid:
         """True if cell is likely free (occupancy < threshold)."""
         if not (0 <= cx < self.cols and 0 <= cy < self.rows):
             return False
-        p = _prob_from_log_odds(float(self.grid[cy, cx]))
-        return p < free_threshold
+        # Log-odds is monotonic in p, so compare in log-odds space (no exp per query)
+        return float(self.grid[cy, cx]) < _log_odds(free_threshold)
 
     def is_cell_occupied(self, cx: int, cy: int, occupied_threshold: float = 0.6) -> bool:
         """True if cell is likely occupied."""
         if not (0 <= cx < self.cols and 0 <= cy < self.rows):
             return True
-        p = _prob_from_log_odds(float(self.grid[cy, cx]))
-        return p > occupied_threshold
+        return float(self.grid[cy, cx]) > _log_odds(occupied_threshold)
 
     def get_best_direction(
         self, robot_x: float, robot_y: float, heading_deg: float, look_ahead_cells: int = 3
@@ -148,33 +181,26 @@ class OccupancyGrid:
         Return (command, turn_deg) for occupancy-based navigation.
         Prefer forward if clear, else turn toward most open direction.
         """
-        c = self._world_to_cell(robot_x, robot_y)
-        if c is None:
+        if self._world_to_cell(robot_x, robot_y) is None:
             return ("F", 0.0)
-        cx, cy = c
-
-        def cells_ahead(angle_offset_deg: float, n: int) -> list[tuple[int, int]]:
-            a = np.radians(heading_deg + angle_offset_deg)
-            cells = []
-            for step in range(1, n + 1):
-                dx = step * self.resolution * np.sin(a)
-                dy = step * self.resolution * np.cos(a)
-                wx = robot_x + dx
-                wy = robot_y + dy
-                cc = self._world_to_cell(wx, wy)
-                if cc:
-                    cells.append(cc)
-            return cells
-
-        def path_clear(angle_offset: float) -> bool:
-            for (px, py) in cells_ahead(angle_offset, look_ahead_cells):
-                if self.is_cell_occupied(px, py):
-                    return False
-            return True
 
-        if path_clear(0):
-            return ("F", 0.0)
-        for angle in [45, -45, 90, -90, 135, -135]:
-            if path_clear(angle):
+        occupied_L = _log_odds(0.6)  # is_cell_occupied's default threshold
+        grid = self.grid
+        for angle in _CANDIDATE_TURNS:
+            # Scalar math per candidate: a handful of cells, cheaper than NumPy dispatch
+            a = math.radians(heading_deg + angle)
+            sin_a = math.sin(a)
+            cos_a = math.cos(a)
+            clear = True
+            for step in range(1, look_ahead_cells + 1):
+                cx = int((robot_x + step * self.resolution * sin_a - self.x_min) / self.resolution)
+                cy = int((robot_y + step * self.resolution * cos_a - self.y_min) / self.resolution)
+                # Off-grid cells are ignored, as before
+                if 0 <= cx < self.cols and 0 <= cy < self.rows and grid[cy, cx] > occupied_L:
+                    clear = False
+                    break
+            if clear:
+                if angle == 0:
+                    return ("F", 0.0)
                 return ("L" if angle < 0 else "R", angle)
         return ("S", 0.0)
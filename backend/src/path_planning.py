@@ -300,10 +300,10 @@ def run_simulation(steps: int = 60, step_delay: float = 0.3):
 
         # Update simulated position
         robot.heading_deg = (robot.heading_deg + turn) % 360
-        rad = math.radians(robot.heading_deg)
+        rad = math.radians(90 - robot.heading_deg)
         move = PathPlanner.STEP_SIZE_M * speed
-        robot.x += move * math.cos(math.radians(90 - robot.heading_deg))
-        robot.y += move * math.sin(math.radians(90 - robot.heading_deg))
+        robot.x += move * math.cos(rad)
+        robot.y += move * math.sin(rad)
         robot.distance_travelled += move
         robot.action = action
         robot.speed  = speed
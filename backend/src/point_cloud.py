@@ -7,6 +7,8 @@ Three.js mapping: X = East, Y = 0 (ground), Z = North.
 import math
 from typing import List
 
+import numpy as np
+
 
 def polar_to_cartesian(
     angle_deg: float,
@@ -37,6 +39,42 @@ def polar_to_cartesian(
     return (world_x, 0.0, world_z)
 
 
+def sweep_directions(
+    angles_deg: np.ndarray, robot_heading_deg: float = 0.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    World-frame unit vectors (x, z) for sensor angles at the given robot heading.
+    Compute once per packet and pass to polar_to_cartesian_array() so every
+    conversion of the same readings shares the trig.
+    """
+    angle_rad = np.radians(np.asarray(angles_deg, dtype=np.float64))
+    sin_a = np.sin(angle_rad)
+    cos_a = np.cos(angle_rad)
+    heading_rad = -math.radians(robot_heading_deg)
+    cos_h = math.cos(heading_rad)
+    sin_h = math.sin(heading_rad)
+    return sin_a * cos_h - cos_a * sin_h, sin_a * sin_h + cos_a * cos_h
+
+
+def polar_to_cartesian_array(
+    angles_deg: np.ndarray,
+    distances_cm: np.ndarray,
+    robot_x: float = 0.0,
+    robot_y: float = 0.0,
+    robot_heading_deg: float = 0.0,
+    directions: tuple[np.ndarray, np.ndarray] | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    polar_to_cartesian() over whole arrays of readings; returns (x, y, z) arrays in metres.
+    directions: optional sweep_directions() result for these angles and heading.
+    """
+    dir_x, dir_z = directions or sweep_directions(angles_deg, robot_heading_deg)
+    distance_m = np.asarray(distances_cm, dtype=np.float64) / 100.0
+    world_x = distance_m * dir_x + robot_x
+    world_z = distance_m * dir_z + robot_y
+    return world_x, np.zeros_like(world_x), world_z
+
+
 def readings_to_points(
     readings: List[tuple[float, float]],
     robot_x: float,
@@ -44,14 +82,50 @@ def readings_to_points(
     robot_heading_deg: float,
 ) -> List[list[float]]:
     """Convert list of (angle_deg, distance_cm) to list of [x, y, z]."""
-    points = []
-    for angle_deg, distance_cm in readings:
-        if distance_cm > 0 and distance_cm < 400:  # Sanity filter (4m max)
-            x, y, z = polar_to_cartesian(
-                angle_deg, distance_cm, robot_x, robot_y, robot_heading_deg
-            )
-            points.append([x, y, z])
-    return points
+    if not readings:
+        return []
+    angles, dists = np.asarray(readings, dtype=np.float64).T
+    keep = (dists > 0) & (dists < 400)  # Sanity filter (4m max)
+    x, y, z = polar_to_cartesian_array(
+        angles[keep], dists[keep], robot_x, robot_y, robot_heading_deg
+    )
+    return np.column_stack((x, y, z)).tolist()
+
+
+class PointCloudBuffer:
+    """
+    Most recent points (up to capacity) as rows of one (N, 3) float array instead of
+    a list per point. Appends are amortised O(1); tail() is a view valid until the
+    next extend().
+    """
+
+    def __init__(self, capacity: int = 2000):
+        self.capacity = capacity
+        # Twice the capacity so the live window stays contiguous (see ThermalHistory)
+        self._buf = np.empty((2 * capacity, 3))
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def extend(self, points: np.ndarray) -> None:
+        n = len(points)
+        if n >= self.capacity:
+            self._buf[:self.capacity] = points[-self.capacity:]
+            self._start, self._end = 0, self.capacity
+            return
+        if self._end + n > 2 * self.capacity:
+            keep = min(len(self), self.capacity - n)
+            self._buf[:keep] = self._buf[self._end - keep:self._end]
+            self._start, self._end = 0, keep
+        self._buf[self._end:self._end + n] = points
+        self._end += n
+        self._start = max(self._start, self._end - self.capacity)
+
+    def tail(self, n: int) -> np.ndarray:
+        """Newest n points (or all, if fewer), oldest first."""
+        return self._buf[max(self._start, self._end - n):self._end]
 
 
 def add_to_ring_buffer(
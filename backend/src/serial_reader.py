@@ -4,12 +4,13 @@ Reads JSON lines from serial port and feeds into the same pipeline as HTTP POST.
 Handles disconnects, Arduino resets, and Windows ClearCommError by reconnecting.
 """
 
-import json
 import logging
 import threading
-from queue import Queue
+from typing import Callable
 
-from .models import ArduinoReadingsPayload
+import orjson
+
+from .models import ArduinoReadingsPayload, FrontendUpdate
 
 logger = logging.getLogger(__name__)
 
@@ -17,13 +18,13 @@ RECONNECT_DELAY = 2.0
 MAX_RECONNECT_ATTEMPTS = 10
 
 # Arduino Uno VID/PID: official (2341:0043), CH340 clones (1A86:7523, 1A86:5523)
-ARDUINO_UNO_IDS = [
+ARDUINO_UNO_IDS = frozenset({
     (0x2341, 0x0043),  # Arduino Uno (official)
     (0x2341, 0x0001),  # Arduino Uno (older)
     (0x1A86, 0x7523),  # CH340
     (0x1A86, 0x5523),  # CH340 variant
     (0x10C4, 0xEA60),  # CP2102
-]
+})
 
 
 def find_arduino_uno_port() -> str | None:
@@ -47,16 +48,32 @@ def find_arduino_uno_port() -> str | None:
     return None
 
 
+def _set_low_latency(ser) -> None:
+    """
+    Best effort: set ASYNC_LOW_LATENCY on the port (FTDI latency timer 16 ms -> 1 ms).
+    pyserial only offers this on Linux, and not every USB-serial driver accepts it.
+    """
+    set_mode = getattr(ser, "set_low_latency_mode", None)
+    if set_mode is None:
+        return
+    try:
+        set_mode(True)
+    except (ValueError, OSError) as e:
+        logger.debug("Low-latency mode not available on %s: %s", ser.port, e)
+
+
 def run_serial_reader(
     port: str,
     baud_rate: int,
     connection,
-    update_queue: Queue,
+    publish: Callable[[tuple[bytes, FrontendUpdate]], None],
     stop_event: threading.Event,
 ) -> None:
     """
     Run in a background thread. Reads JSON lines from serial, parses,
-    feeds to connection, and puts FrontendUpdate JSON on queue for broadcast.
+    feeds to connection, and passes (FrontendUpdate JSON bytes, FrontendUpdate)
+    to publish for broadcast, so the event loop never has to decode it. publish is
+    called from this thread and must be thread-safe (e.g. wrap loop.call_soon_threadsafe).
     Handles SerialException (disconnect, Arduino reset, Windows ClearCommError)
     by closing and reconnecting. Stops when stop_event is set.
     """
@@ -68,7 +85,7 @@ def run_serial_reader(
         return
 
     ser = None
-    buffer = ""
+    buffer = bytearray()  # raw bytes; only completed lines are decoded
     msg_count = 0
     reconnect_attempt = 0
 
@@ -77,6 +94,7 @@ def run_serial_reader(
         if ser is None or not ser.is_open:
             try:
                 ser = serial.Serial(port, baud_rate, timeout=0.1)
+                _set_low_latency(ser)
                 logger.info("Serial connected on %s at %d baud", port, baud_rate)
                 reconnect_attempt = 0
             except SerialException as e:
@@ -92,31 +110,38 @@ def run_serial_reader(
                 return
 
         try:
-            if stop_event.is_set():
-                break
             # in_waiting can raise SerialException on disconnect or Windows ClearCommError
             try:
-                n = ser.in_waiting if ser.in_waiting else 256
+                n = ser.in_waiting
             except (SerialException, OSError):
                 raise SerialException("Port disconnected during in_waiting")
-            chunk = ser.read(min(n, 4096))
+            # Drain what is buffered; if nothing is, block for a single byte, which returns
+            # as soon as data arrives (a larger read would hold a short tail until timeout)
+            chunk = ser.read(min(n, 4096) or 1)
             if not chunk:
                 continue
-            buffer += chunk.decode("utf-8", errors="ignore")
-
-            while "\n" in buffer:
-                line, _, buffer = buffer.partition("\n")
-                line = line.strip().rstrip("\r")
+            buffer += chunk
+            end = buffer.rfind(b"\n")
+            if end < 0:
+                continue
+            # All complete lines in one split; only the partial tail stays buffered
+            lines = buffer[:end].split(b"\n")
+            del buffer[:end + 1]
+
+            # Every line updates the connection, but only the chunk's newest update is
+            # published: the broadcaster skips stale ones anyway, so don't encode them
+            latest = None
+            for raw in lines:
+                line = raw.decode("utf-8", errors="ignore").strip()
                 if not line or not line.startswith("{"):
                     continue
 
-                logger.info("<- Serial received: %s", line)
+                logger.debug("<- Serial received: %s", line)
 
                 try:
-                    data = json.loads(line)
+                    data = orjson.loads(line)
                     payload = ArduinoReadingsPayload(**data)
-                    update = connection.receive_readings(payload)
-                    update_queue.put(update.model_dump_json())
+                    latest = connection.receive_readings(payload)
                     cmd = connection.pop_pending_motor_cmd()
                     if cmd:
                         try:
@@ -126,7 +151,7 @@ def run_serial_reader(
                         msg_count += 1
                         if msg_count <= 5 or msg_count % 20 == 0:
                             logger.info("-> Arduino cmd #%d: %s", msg_count, cmd)
-                except json.JSONDecodeError as e:
+                except orjson.JSONDecodeError as e:
                     pos = getattr(e, "pos", None)
                     ctx = ""
                     if pos is not None and 0 <= pos < len(line):
@@ -142,6 +167,12 @@ def run_serial_reader(
                 except Exception as e:
                     logger.exception("Error processing serial payload")
 
+            if latest is not None:
+                try:
+                    publish((latest.model_dump_json().encode(), latest))
+                except Exception:
+                    logger.exception("Error publishing serial update")
+
         except SerialException as e:
             logger.warning("Serial error (will reconnect): %s", e)
             try:
@@ -2,6 +2,9 @@ import { useState, useEffect } from 'react'
 
 const WS_URL = import.meta.env.VITE_WS_URL ?? 'ws://localhost:8000/ws'
 
+// /ws sends UTF-8 JSON as binary frames
+const frameDecoder = new TextDecoder()
+
 export interface RobotPose {
   x: number
   y: number
@@ -60,6 +63,7 @@ export function useRobotData() {
 
     const connect = () => {
       ws = new WebSocket(WS_URL)
+      ws.binaryType = 'arraybuffer'
 
       ws.onopen = () => {
         setConnected(true)
@@ -67,7 +71,8 @@ export function useRobotData() {
 
       ws.onmessage = (event) => {
         try {
-          const msg = JSON.parse(event.data) as RobotData
+          const text = typeof event.data === 'string' ? event.data : frameDecoder.decode(event.data)
+          const msg = JSON.parse(text) as RobotData
           setData({
             points: msg.points ?? [],
             robot: msg.robot ?? defaultRobot,
@@ -14,6 +14,9 @@ const WS_URL =
 
 const PHYSICAL_ROBOT_ID = 'robot-4'
 
+// /ws/live sends orjson-encoded binary frames
+const frameDecoder = new TextDecoder()
+
 interface RobotState {
   position?: { x: number; y: number; theta?: number }
   ultrasonic_distance_cm?: number
@@ -23,6 +26,20 @@ interface RobotState {
   room_name?: string
 }
 
+/** One robot's entry in a /ws/live tick; delta ticks carry *_append / *_delta fields. */
+interface RobotUpdate extends RobotState {
+  robot_id: string
+  trail?: [number, number][]
+  trail_append?: [number, number][]
+  trail_len?: number
+  heatmap_cells?: Record<string, number>
+  heatmap_delta?: Record<string, number>
+  heatmap_rows?: number
+  heatmap_cols?: number
+  obstacle_points?: number[][]
+  point_cloud?: number[][]
+}
+
 interface RoomAnalytics {
   room_id: number
   room_name: string
@@ -112,35 +129,55 @@ export default function LiveDashboardPage() {
 
   useEffect(() => {
     const ws = new WebSocket(WS_URL + '/ws/live')
+    ws.binaryType = 'arraybuffer'
     ws.onopen = () => setConnected(true)
     ws.onclose = () => setConnected(false)
     ws.onerror = () => setConnected(false)
+    const applyRobotUpdate = (data: RobotUpdate) => {
+      if (!data.robot_id) return
+      const rid = data.robot_id
+      const s: RobotState = {
+        position: data.position,
+        ultrasonic_distance_cm: data.ultrasonic_distance_cm,
+        temperature_c: data.temperature_c,
+        humidity_percent: data.humidity_percent,
+        room_id: data.room_id,
+        room_name: data.room_name,
+      }
+      setRobotStates((prev) => ({ ...prev, [rid]: s }))
+      if (rid === selectedRobotId) {
+        setState(s)
+        if (Array.isArray(data.trail)) {
+          setTrail(data.trail)
+        } else if (Array.isArray(data.trail_append)) {
+          // Delta frame: append new points, keep the server's trail length
+          const appended = data.trail_append
+          const len = data.trail_len ?? 0
+          setTrail((prev) => {
+            const next = prev.concat(appended)
+            return next.slice(Math.max(0, next.length - len))
+          })
+        }
+        if (data.heatmap_cells) setHeatmapCells(data.heatmap_cells)
+        else if (data.heatmap_delta) {
+          const delta = data.heatmap_delta
+          setHeatmapCells((prev) => ({ ...prev, ...delta }))
+        }
+        if (data.heatmap_rows != null) setHeatmapRows(data.heatmap_rows)
+        if (data.heatmap_cols != null) setHeatmapCols(data.heatmap_cols)
+        if (Array.isArray(data.obstacle_points)) setObstaclePoints(data.obstacle_points)
+        if (Array.isArray(data.point_cloud)) setPointCloud(data.point_cloud)
+        setIsLoadingSelectedRobot(false)
+      }
+    }
     ws.onmessage = (e) => {
       try {
-        const data = JSON.parse(e.data)
-        if (data.type === 'analytics') {
-          setRooms(data.rooms || [])
-        } else if (data.type === 'robot_update' && data.robot_id) {
-          const rid = data.robot_id
-          const s: RobotState = {
-            position: data.position,
-            ultrasonic_distance_cm: data.ultrasonic_distance_cm,
-            temperature_c: data.temperature_c,
-            humidity_percent: data.humidity_percent,
-            room_id: data.room_id,
-            room_name: data.room_name,
-          }
-          setRobotStates((prev) => ({ ...prev, [rid]: s }))
-          if (rid === selectedRobotId) {
-            setState(s)
-            if (Array.isArray(data.trail)) setTrail(data.trail)
-            if (data.heatmap_cells) setHeatmapCells(data.heatmap_cells)
-            if (data.heatmap_rows != null) setHeatmapRows(data.heatmap_rows)
-            if (data.heatmap_cols != null) setHeatmapCols(data.heatmap_cols)
-            if (Array.isArray(data.obstacle_points)) setObstaclePoints(data.obstacle_points)
-            if (Array.isArray(data.point_cloud)) setPointCloud(data.point_cloud)
-            setIsLoadingSelectedRobot(false)
-          }
+        const text = typeof e.data === 'string' ? e.data : frameDecoder.decode(e.data)
+        const data = JSON.parse(text)
+        // One frame per tick: room analytics plus every robot's update
+        if (data.type === 'tick') {
+          setRooms(data.analytics || [])
+          if (Array.isArray(data.robots)) data.robots.forEach(applyRobotUpdate)
         }
       } catch {
         // ignore parse errors